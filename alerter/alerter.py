@@ -6,18 +6,26 @@
 # sys.path.append(lib_path)
 
 import logging
+import math
 import time
 from datetime import datetime
 import threading
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import cached_property
 import random
 
 from rgbmatrix import graphics
-import requests
-from PIL import Image, ImageEnhance
 
 from samplebase import SampleBase
-import ping3
+from frame_scheduler import FrameScheduler
+from frame_stats import FrameStats
+from layers import CachedLayer
+from text_strips import BdfFont, StripCache
+from icon_cache import IconCache
+from http_client import Endpoint
+from connectivity import ConnectivityMonitor
+from poll_scheduler import DataSource, PollScheduler
+from push_server import PushServer
 
 
 log = logging.getLogger(__name__)
@@ -33,13 +41,57 @@ class Message:
 class Icon:
     name: str
     text: str
-    image: Image = None
+
+
+@dataclass(frozen=True)
+class DisplayState:
+    """
+    Everything fetched that changes what's on the sign.  It's never modified,
+    a new one is published instead (see publish()), so the render loop can
+    just pick up the current one once per frame without any locking
+    """
+    alert: str = None
+    messages: tuple = ()
+    connected_to_internet: bool = True
+    daddy_sleeping: bool = False
+    internet_failover: bool = None
+
+    @cached_property
+    def alert_text(self):
+        """
+        The text for the alert screen, or None if there's nothing to alert
+        """
+        if self.connected_to_internet:
+            return self.alert
+        if self.alert:
+            return f"{self.alert}    {NO_INTERNET_MESSAGE}"
+        return NO_INTERNET_MESSAGE
+
 
 TIME_FORMAT_24_HOUR = False
 
-FETCH_EVERY = 30
 FETCH_ENDPOINT = "http://lemon.com/api/messages"
 SLEEP_ENDPOINT = "https://sleep.fig14.com/am-i-sleeping"
+# How often each source is polled, in seconds.  The alert and BTC price come
+# with the MOTD, and an unchanged payload is only a 304
+FETCH_EVERY = 5
+SLEEP_CHECK_EVERY = 60
+# (connect, read) timeouts for each endpoint
+FETCH_TIMEOUT = (3.05, 10)
+SLEEP_TIMEOUT = (3.05, 10)
+
+# Pinged to see if we're connected - any one of them answering will do.  See
+# ConnectivityMonitor for how the rounds of pings add up to a verdict
+INTERNET_CHECK_HOSTS = ("8.8.8.8", "1.1.1.1")
+INTERNET_CHECK_EVERY = 10
+INTERNET_RECHECK_EVERY = 2
+PING_TIMEOUT = 2
+INTERNET_DOWN_AFTER = 3
+INTERNET_UP_AFTER = 2
+
+# Where to listen for pushed alerts and messages, see start_push_server()
+PUSH_HOST = "127.0.0.1"
+PUSH_PORT = 8642
 
 WHITE = graphics.Color(80, 80, 80)
 CLOCK_COLOUR = graphics.Color(37, 37, 37)
@@ -57,18 +109,37 @@ CANVAS_HEIGHT = 32
 
 ICON_PROBABILITY = 0.05
 
+NO_INTERNET_MESSAGE = "Internet is Down!"
+
+FRAME_PERIOD = 0.025
+# Pixels per second for all of the scrolling text and icons
+SCROLL_SPEED = 40
+
+# Memory budget for the pre-rasterized message and alert text
+STRIP_CACHE_BYTES = 512 * 1024
+
+ICON_DIR = "../icons"
+ICON_CACHE_DIR = "../icons/.cache"
+ICON_BRIGHTNESS = 0.5
+
+
+display_state = DisplayState()
+# Held by the threads publishing a new display state, never by the render loop
+state_lock = threading.RLock()
 
 last_motd = None
 last_ai_motd = None
-messages = []
+# The messages from each source, combined by update_messages()
+motd_messages = []
+sleep_messages = []
 message = None
 message_index = 0
 
-daddy_sleeping = False
-internet_failover = None
-
-alert = None
-no_internet_message = None
+motd_endpoint = Endpoint(FETCH_ENDPOINT, FETCH_TIMEOUT)
+sleep_endpoint = Endpoint(SLEEP_ENDPOINT, SLEEP_TIMEOUT)
+# The last full MOTD response and the date it was shown with
+motd_response = None
+motd_date = None
 
 message_pos = CANVAS_WIDTH
 alert_pos = CANVAS_WIDTH
@@ -77,12 +148,27 @@ alert_pos = CANVAS_WIDTH
 time_font = graphics.Font()
 seconds_font = graphics.Font()
 pm_font = graphics.Font()
-alert_font = graphics.Font()
-message_font = graphics.Font()
+# Scrolling text is drawn from pre-rasterized strips, see load_fonts()
+alert_font = None
+message_font = None
+
+text_strips = StripCache(STRIP_CACHE_BYTES)
+
+# Off-screen canvases holding the two clock faces, created by create_layers()
+clock_layer = None
+small_clock_layer = None
+
+# The fixed shapes drawn over the screens, each drawn in one native call
+alert_bars = graphics.DrawList()
+alert_bars.Rect(0, 0, CANVAS_WIDTH, 2, ALERT_COLOUR)
+alert_bars.Rect(0, CANVAS_HEIGHT - 2, CANVAS_WIDTH, 2, ALERT_COLOUR)
+
+sleeping_underline = graphics.DrawList()
+sleeping_underline.Rect(0, CANVAS_HEIGHT - 2, CANVAS_WIDTH, 1, SLEEPING_UNDERLINE_COLOUR)
 
-message_lock = threading.Lock()
-alert_lock = threading.Lock()
-internet_lock = threading.Lock()
+# A little square in the bottom right corner
+internet_failover_marker = graphics.DrawList()
+internet_failover_marker.Rect(CANVAS_WIDTH - 3, CANVAS_HEIGHT - 3, 3, 3, INTERNET_FAILOVER_COLOUR)
 
 icons = [
     Icon("pikachu", "Pika pika!"),
@@ -94,11 +180,8 @@ icons = [
     Icon("eye", "Eye of Cthulhu!"),
 ]
 
-for icon in icons:
-    image = Image.open(f"../icons/{icon.name}.png").convert("RGB")
-    enhancer = ImageEnhance.Brightness(image)
-    # to reduce brightness by 50%, use factor 0.5
-    icon.image = enhancer.enhance(0.5)
+# Icons are only decoded (once, into the cache directory) by load_icons()
+icon_cache = IconCache(ICON_DIR, ICON_CACHE_DIR, ICON_BRIGHTNESS, CANVAS_HEIGHT)
 
 
 icon_pos = CANVAS_WIDTH
@@ -107,142 +190,214 @@ icon = random.choice(icons)
 
 def show_random_icon():
     global icon, icon_pos
+    if not icons:
+        return
+
     icon = random.choice(icons)
     log.info(icon.text)
     icon_pos = CANVAS_WIDTH
 
 
-def ping_remote_server(host="8.8.8.8"):
-    try:
-        response = ping3.ping(host, timeout=5)
-        if response is not None:
-            return True
-        else:
-            log.info(f"{host} is not reachable.")
-            return False
-    except exceptions.PingError as e:
-        log.info(f"Ping error for {host}: {e}")
-        return False
+def publish(**changes):
+    """
+    Replace the display state with a copy that has the given changes
+    """
+    global display_state
 
+    with state_lock:
+        display_state = replace(display_state, **changes)
 
-def check_internet(num_attempts=2):
-    for i in range(num_attempts):
-        if i != 0:
-            log.info(f"Retrying (attempt {i+1})")
 
-        if ping_remote_server():
-            return True
+def update_messages(**changes):
+    """
+    Publish the scrolling messages rebuilt from the latest result of each
+    source, along with any other changes
+    """
+    with state_lock:
+        publish(messages=tuple(motd_messages + sleep_messages), **changes)
+
+
+def fetch_motd(timeout):
+    global motd_messages
+
+    r = motd_endpoint.fetch(timeout)
+    date_str = datetime.now().strftime("%a %d %b")
+
+    if r is None:
+        # Not modified - nothing to do unless the date on the AI MOTD is out of date
+        if date_str == motd_date:
+            return
+        response = motd_response
+    elif r.status_code != 200:
+        error = f"ERROR: received {r.status_code} from {FETCH_ENDPOINT}"
+        log.error(error)
+        with state_lock:
+            motd_messages = [Message(ALERT_COLOUR, error)]
+            update_messages()
+        # Back off until the server is happy again
+        r.raise_for_status()
+        return
+    else:
+        response = r.json()
+
+    apply_messages(response, date_str)
+    if r is not None:
+        motd_endpoint.commit(r)
+
+
+def apply_messages(response, date_str):
+    """
+    Update the display state from a payload of the messages endpoint, either
+    polled or pushed
+    """
+    global motd_messages, last_motd, last_ai_motd, motd_response, motd_date
+
+    new_messages = []
 
-    return False
+    motd = response["motd"].replace("\r", "").replace("\n", "  ")
+    if motd != last_motd:
+        log.info(f"MOTD: {motd}")
+        last_motd = motd
+
+    new_messages.append(Message(MOTD_COLOUR, motd))
+
+    ai_motd = response["ai_motd"].replace("\r", "").replace("\n", "  ")
+    if ai_motd != last_ai_motd:
+        log.info(f"AI MOTD: {ai_motd}")
+        last_ai_motd = ai_motd
+
+    # Add the date to the AI MOTD
+    ai_motd = " - ".join([date_str, ai_motd])
+    new_messages.append(Message(AI_MOTD_COLOUR, ai_motd))
+
+    btc = response["btc"]
+    new_messages.append(Message(BTC_COLOUR, btc))
+
+    set_alert(response["alert"])
+
+    # Connection status
+    connection_status = response["connection-status"]
+    internet_failover = connection_status != "normal"
+    if internet_failover != display_state.internet_failover:
+        log.info(f"Failover status changed to {internet_failover}")
+
+    with state_lock:
+        motd_messages = new_messages
+        motd_response = response
+        motd_date = date_str
+        update_messages(internet_failover=internet_failover)
+
+
+def set_alert(new_alert):
+    with state_lock:
+        if display_state.alert != new_alert:
+            publish(alert=new_alert)
+            if new_alert is None:
+                log.info("Alert over")
+            else:
+                log.info(f"ALERT: {new_alert}")
+
+
+def push_alert(payload):
+    """
+    POST /alert {"alert": "text"}, or {"alert": null} to end it
+    """
+    new_alert = payload["alert"]
+    if new_alert is not None and not isinstance(new_alert, str):
+        raise TypeError("alert must be a string or null")
+
+    set_alert(new_alert)
+    # So the next poll puts back what the messages endpoint says
+    motd_endpoint.forget()
+
+
+def push_messages(payload):
+    """
+    POST /messages with the same JSON the messages endpoint returns
+    """
+    # Check first so a bad payload is rejected without being half applied
+    missing = [key for key in ("motd", "ai_motd", "btc", "alert", "connection-status") if key not in payload]
+    if missing:
+        raise KeyError(", ".join(missing))
+
+    # Anything else would only blow up later, in the render loop
+    errors = [f"{key} must be a string" for key in ("motd", "ai_motd", "btc", "connection-status")
+              if not isinstance(payload[key], str)]
+    if payload["alert"] is not None and not isinstance(payload["alert"], str):
+        errors.append("alert must be a string or null")
+    if errors:
+        raise TypeError(", ".join(errors))
+
+    apply_messages(payload, datetime.now().strftime("%a %d %b"))
+    motd_endpoint.forget()
+
+
+def fetch_sleep_status(timeout):
+    global sleep_messages
+
+    # Going by the last ping, so this doesn't have to wait for the next one
+    if not display_state.connected_to_internet:
+        return
+
+    sleep_response = sleep_endpoint.fetch(timeout)
+
+    if sleep_response is None:
+        # Not modified
+        return
+
+    elif sleep_response.status_code != 200:
+        error = f"ERROR: received {sleep_response.status_code} from {SLEEP_ENDPOINT}"
+        log.error(error)
+        with state_lock:
+            sleep_messages = [Message(ALERT_COLOUR, error)]
+            update_messages()
+
+    else:
+        sleep_str = sleep_response.text
+        daddy_sleeping = "asleep" in sleep_str
+        if daddy_sleeping != display_state.daddy_sleeping:
+            log.info(f"Sleep status: {sleep_str}")
+
+        with state_lock:
+            if daddy_sleeping:
+                sleep_messages = [Message(SLEEPING_COLOUR, "Daddy is sleeping zzZzZzZZzZZzz...")]
+            else:
+                sleep_messages = []
+            update_messages(daddy_sleeping=daddy_sleeping)
+
+        sleep_endpoint.commit(sleep_response)
+
+    # Back off if that was an error
+    sleep_response.raise_for_status()
 
 
 def get_messages():
     """
     Continuously poll for messages - run this in a thread!
-    """
-    global alert, messages, last_motd, last_ai_motd, daddy_sleeping, \
-        no_internet_message, internet_failover
 
+    Every source is polled on its own schedule and merges its own result into
+    the display state as soon as it arrives, so one slow server doesn't hold
+    up everything else.  Connectivity is checked separately, see
+    start_connectivity_monitor().
+    """
     log.info("Starting message fetch loop")
 
-    while True:
-        try:
-            new_messages = []
-
-            connected_to_internet = check_internet()
-            with internet_lock:
-                if connected_to_internet:
-                    no_internet_message = None
-                else:
-                    no_internet_message = "Internet is Down!"
-
-            # Fetch MOTD
-            r = requests.get(FETCH_ENDPOINT)
-            if r.status_code != 200:
-                with message_lock:
-                    error = f"ERROR: received {r.status_code} from {FETCH_ENDPOINT}"
-                    log.error(error)
-                    messages.append(error)
-                    continue
-            else:
-                response = r.json()
-
-                motd = response["motd"].replace("\r", "").replace("\n", "  ")
-                if motd != last_motd:
-                    log.info(f"MOTD: {motd}")
-                    last_motd = motd
-                
-                new_messages.append(Message(MOTD_COLOUR, motd))
-
-                ai_motd = response["ai_motd"].replace("\r", "").replace("\n", "  ")
-                if ai_motd != last_ai_motd:
-                    log.info(f"AI MOTD: {ai_motd}")
-                    last_ai_motd = ai_motd
-
-                # Add the date to the AI MOTD
-                now = datetime.now()
-                date_str = now.strftime("%a %d %b")
-                ai_motd = " - ".join([date_str, ai_motd])
-                new_messages.append(Message(AI_MOTD_COLOUR, ai_motd))
-
-                btc = response["btc"]
-                new_messages.append(Message(BTC_COLOUR, btc))
-
-                with alert_lock:
-                    if alert != response["alert"]:
-                        alert = response["alert"]
-                        if alert is None:
-                            log.info("Alert over")
-                        else:
-                            log.info(f"ALERT: {alert}")
-
-                # Connection status
-                connection_status = response["connection-status"]
-                new_internet_failover = connection_status != "normal"
-                if new_internet_failover != internet_failover:
-                    log.info(f"Failover status changed to {new_internet_failover}")
-                    internet_failover = new_internet_failover
-
-            # Fetch sleep status
-            if connected_to_internet:
-                sleep_response = requests.get(SLEEP_ENDPOINT)
-
-                if sleep_response.status_code != 200:
-                    error = f"ERROR: received {r.status_code} from {SLEEP_ENDPOINT}"
-                    log.error(error)
-                    new_messages.append(Message(ALERT_COLOUR, error))
-
-                else:
-                    sleep_str = sleep_response.text
-                    new_sleeping = "asleep" in sleep_str
-                    if new_sleeping != daddy_sleeping:
-                        log.info(f"Sleep status: {sleep_str}")
-
-                    daddy_sleeping = new_sleeping
-
-                    if daddy_sleeping:
-                        new_messages.append(Message(SLEEPING_COLOUR, "Daddy is sleeping zzZzZzZZzZZzz..."))
-
-            with message_lock:
-                messages = new_messages
-
-        except Exception as e:
-            log.exception(f"Exception in main loop: {e}")
-
-        time.sleep(30)
-
-
-def render_and_scroll_alert(canvas, unix_time, alert_text):
+    scheduler = PollScheduler([
+        DataSource("messages", fetch_motd, FETCH_EVERY, FETCH_TIMEOUT),
+        DataSource("sleep status", fetch_sleep_status, SLEEP_CHECK_EVERY, SLEEP_TIMEOUT),
+    ])
+    scheduler.run()
+
+
+def render_and_scroll_alert(canvas, unix_time, alert_text, dt):
     global alert_pos
 
     if (int(unix_time) % 2) == 0:
-        graphics.DrawLine(canvas, 0, 0, CANVAS_WIDTH, 0, ALERT_COLOUR)
-        graphics.DrawLine(canvas, 0, 1, CANVAS_WIDTH, 1, ALERT_COLOUR)
-        graphics.DrawLine(canvas, 0, CANVAS_HEIGHT - 2, CANVAS_WIDTH, CANVAS_HEIGHT - 2, ALERT_COLOUR)
-        graphics.DrawLine(canvas, 0, CANVAS_HEIGHT - 1, CANVAS_WIDTH, CANVAS_HEIGHT - 1, ALERT_COLOUR)
+        alert_bars.Draw(canvas)
 
-    length = graphics.DrawText(canvas, alert_font, alert_pos, 26, ALERT_COLOUR, alert_text)
-    alert_pos -= 1
+    strip = text_strips.get(alert_font, alert_text, ALERT_COLOUR)
+    length = strip.draw(canvas, math.floor(alert_pos), 26)
+    alert_pos -= SCROLL_SPEED * dt
     if (alert_pos + length < 0):
         alert_pos = CANVAS_WIDTH
 
@@ -307,95 +462,264 @@ def render_time(canvas, now):
     # graphics.DrawText(canvas, time_font, 4, 11, CLOCK_COLOUR, time_str)
 
 
-def main(matrix):
+def load_fonts():
+    global message_font, alert_font
+
+    time_font.LoadFont("../fonts/7x13.bdf")
+    seconds_font.LoadFont("../fonts/clR6x12.bdf")
+    pm_font.LoadFont("../fonts/4x6.bdf")
+    message_font = BdfFont("../fonts/6x13.bdf")
+    alert_font = BdfFont("../fonts/7x13B.bdf")
+
+    # Most messages and alerts are ASCII, in one of these colours
+    printable = range(32, 127)
+    for colour in (MOTD_COLOUR, AI_MOTD_COLOUR, BTC_COLOUR, SLEEPING_COLOUR, ALERT_COLOUR):
+        message_font.preload(printable, colour)
+    alert_font.preload(printable, ALERT_COLOUR)
+
+
+def load_icons():
+    """
+    Get every icon's blob ready now, so showing one never decodes a PNG in
+    the middle of a frame.  Icons that can't be loaded are left out.
+
+    Call it before creating the matrix, which drops root - the cache might
+    not be writable afterwards
+    """
+    global icons, icon, icon_pos
+
+    failed = icon_cache.preload([i.name for i in icons])
+    if failed:
+        icons = [i for i in icons if i.name not in failed]
+        if not icons:
+            log.error("No icons could be loaded, not showing any")
+            icon = None
+            icon_pos = -32
+        elif icon.name in failed:
+            icon = random.choice(icons)
+
+
+def create_layers(matrix):
+    global clock_layer, small_clock_layer
+
+    clock_layer = CachedLayer(matrix, render_time)
+    small_clock_layer = CachedLayer(matrix, render_time_small_and_bright)
+
+
+def clock_key(now):
+    """
+    The clock layers only need re-rendering when the second or the format changes
+    """
+    return int(now.timestamp()), TIME_FORMAT_24_HOUR
+
+
+def render_frame(canvas, now, dt):
+    """
+    Draw a single frame of the sign into canvas, moving everything that
+    scrolls on by dt seconds
+    """
+    global message_pos, message, message_index, icon_pos
+
+    unix_time = now.timestamp()
+
+    # The state can be replaced at any time, so only look it up once
+    state = display_state
+    alert_to_render = state.alert_text
+
+    if icon_pos > -32:
+        canvas.Clear()
+        icon_cache.load(icon.name).draw(canvas, math.floor(icon_pos))
+        icon_pos -= SCROLL_SPEED * dt
+
+    elif alert_to_render:
+        small_clock_layer.draw(canvas, clock_key(now), now)
+        render_and_scroll_alert(canvas, unix_time, alert_to_render, dt)
+
+    else:
+        # Draw the main clock face
+        clock_layer.draw(canvas, clock_key(now), now)
+
+        if state.daddy_sleeping:
+            sleeping_underline.Draw(canvas)
+
+        if state.internet_failover:
+            internet_failover_marker.Draw(canvas)
+
+        # If no message is loaded, try to load one
+        if message is None:
+            message_index = 0
+            if state.messages:
+                message = state.messages[0]
+
+        # If we have a message
+        if message:
+            strip = text_strips.get(message_font, message.text, message.colour)
+            length = strip.draw(canvas, math.floor(message_pos), 26)
+
+            message_pos -= SCROLL_SPEED * dt
+            if (message_pos + length + 10 < 0):
+                message_pos = CANVAS_WIDTH
+                message_index += 1
+                if message_index >= len(state.messages):
+                    message_index = 0
+                message = state.messages[message_index] if state.messages else None
+
+                # Randomly show icon
+                if random.random() < ICON_PROBABILITY:
+                    show_random_icon()
+
+
+def set_connected(connected):
+    publish(connected_to_internet=connected)
+
+
+def start_connectivity_monitor():
+    """
+    Keep connected_to_internet up to date from a thread of its own, so the
+    fetches never wait on a ping
+    """
+    monitor = ConnectivityMonitor(
+        INTERNET_CHECK_HOSTS, set_connected,
+        interval=INTERNET_CHECK_EVERY,
+        recheck_interval=INTERNET_RECHECK_EVERY,
+        timeout=PING_TIMEOUT,
+        down_after=INTERNET_DOWN_AFTER,
+        up_after=INTERNET_UP_AFTER,
+        connected=display_state.connected_to_internet,
+    )
+    monitor.start()
+    return monitor
+
+
+def start_push_server(host, port):
     """
-    Main function to repeatedly render the sign
+    Accept alerts and messages POSTed as JSON to /alert and /messages.  These
+    are shown from the very next frame, until the next poll of the messages
+    endpoint replaces them with whatever it says
     """
-    global message_pos, messages, message, alert_pos, message_index, \
-        daddy_sleeping, icon_pos, time_font, message_font, alert_font, \
-        seconds_font, pm_font
+    server = PushServer((host, port), {
+        "/alert": push_alert,
+        "/messages": push_messages,
+    })
+    server.start()
+    return server
 
+
+def main(matrix, push_host=PUSH_HOST, push_port=PUSH_PORT, stats_every=0):
+    """
+    Main function to repeatedly render the sign, logging frame timings every
+    stats_every seconds if it isn't 0
+    """
     canvas = matrix.CreateFrameCanvas()
 
-    time_font.LoadFont("../fonts/7x13.bdf")
-    seconds_font.LoadFont("../fonts/clR6x12.bdf")
-    pm_font.LoadFont("../fonts/4x6.bdf")
-    message_font.LoadFont("../fonts/6x13.bdf")
-    alert_font.LoadFont("../fonts/7x13B.bdf")
+    load_fonts()
+    create_layers(matrix)
+
+    if push_port:
+        start_push_server(push_host, push_port)
+
+    start_connectivity_monitor()
 
     message_thread = threading.Thread(target=get_messages, daemon=True)
     message_thread.start()
 
+    scheduler = FrameScheduler(FRAME_PERIOD)
+    dt = scheduler.wait()
+
+    if stats_every:
+        # A separate loop, so that without stats there's nothing to pay for them
+        stats = FrameStats(FRAME_PERIOD, stats_every)
+        clock = time.perf_counter
+
+        while True:
+            start = clock()
+            render_frame(canvas, datetime.now(), dt)
+            rendered = clock()
+
+            dt = scheduler.wait()
+            woken = clock()
+            canvas = matrix.SwapOnVSync(canvas)
+
+            stats.record(rendered - start, woken - rendered, clock() - woken)
+
     while True:
-        canvas.Clear()
-        now = datetime.now()
+        render_frame(canvas, datetime.now(), dt)
+
+        dt = scheduler.wait()
+        canvas = matrix.SwapOnVSync(canvas)
 
-        unix_time = now.timestamp()
 
-        alert_to_render = None
-        with alert_lock:
-            alert_to_render = alert
+def benchmark(matrix, num_frames):
+    """
+    Render num_frames of each of the clock, alert and icon screens as fast as
+    possible and log frames/s and CPU time per frame for each of them.
 
-        with internet_lock:
-            if no_internet_message:
-                if alert_to_render:
-                    alert_to_render = f"{alert_to_render}    {no_internet_message}"
-                else:
-                    alert_to_render = no_internet_message
+    Nothing is fetched, the display state is faked for each screen.
+    """
+    global display_state, message, icon_pos
 
-        if icon_pos > -32:
-            canvas.SetImage(icon.image, icon_pos)
-            icon_pos -= 1
+    canvas = matrix.CreateFrameCanvas()
 
-        elif alert_to_render:
-            render_time_small_and_bright(canvas, now)
-            render_and_scroll_alert(canvas, unix_time, alert_to_render)
+    load_fonts()
+    create_layers(matrix)
+
+    benchmark_state = DisplayState(
+        messages=(
+            Message(MOTD_COLOUR, "Benchmarking the message of the day"),
+            Message(AI_MOTD_COLOUR, "Sun 01 Jan - " + "A rather long AI generated message of the day. " * 4),
+            Message(BTC_COLOUR, "BTC $12,345"),
+        ),
+        daddy_sleeping=True,
+        internet_failover=True,
+    )
+    message = None
 
-        else:
-            # Draw the main clock face
-            render_time(canvas, now)
+    log.info(f"Benchmarking {num_frames} frames per screen")
 
-            if daddy_sleeping:
-                graphics.DrawLine(canvas, 0, CANVAS_HEIGHT - 2, CANVAS_WIDTH, CANVAS_HEIGHT - 2, SLEEPING_UNDERLINE_COLOUR)
-
-            if internet_failover:
-                for i in range(3):
-                    graphics.DrawLine(canvas, CANVAS_WIDTH - 3, CANVAS_HEIGHT - 1 - i, CANVAS_WIDTH, CANVAS_HEIGHT - 1 - i, INTERNET_FAILOVER_COLOUR)
-
-            # If no message is loaded, try to load one
-            if message is None:
-                message_index = 0
-                if messages:
-                    message = messages[0]
-
-            # If we have a message
-            if message:
-                length = graphics.DrawText(canvas, message_font, message_pos, 26, message.colour, message.text)
-
-                message_pos -= 1
-                if (message_pos + length + 10 < 0):
-                    message_pos = CANVAS_WIDTH
-                    message_index += 1
-                    with message_lock:
-                        if message_index >= len(messages):
-                            message_index = 0
-                        message = messages[message_index]
-
-                    # Randomly show icon
-                    if random.random() < ICON_PROBABILITY:
-                        show_random_icon()
-
-        time.sleep(0.025)
-        canvas = matrix.SwapOnVSync(canvas)
+    for screen in ("clock", "alert", "icon"):
+        if screen == "icon" and icon is None:
+            continue
+
+        display_state = replace(benchmark_state, alert="Benchmark alert!" if screen == "alert" else None)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        for i in range(num_frames):
+            if screen == "icon":
+                # Keep the icon scrolling across the screen forever
+                if icon_pos <= -32:
+                    icon_pos = CANVAS_WIDTH
+            else:
+                icon_pos = -32
+
+            # Scroll exactly as far as a frame on the sign would
+            render_frame(canvas, datetime.now(), FRAME_PERIOD)
+            canvas = matrix.SwapOnVSync(canvas)
+
+        wall_time = time.perf_counter() - wall_start
+        cpu_time = time.process_time() - cpu_start
+
+        log.info(f"{screen:>5}: {num_frames / wall_time:8.1f} frames/s, "
+                 f"{cpu_time / num_frames * 1000:.3f} ms CPU/frame")
+
+    display_state = DisplayState()
 
 
 class RunText(SampleBase):
     def __init__(self, *args, **kwargs):
         super(RunText, self).__init__(*args, **kwargs)
         self.parser.add_argument("-t", "--text", help="The text to scroll on the RGB LED panel", default="Hello world!")
+        self.parser.add_argument("--benchmark", metavar="FRAMES", type=int, default=0, help="Render FRAMES frames of each screen as fast as possible, report the timings and exit")
+        self.parser.add_argument("--frame-stats", metavar="SECONDS", type=int, default=0, help="Log how long each phase of the frames took every SECONDS seconds")
+        self.parser.add_argument("--push-host", default=PUSH_HOST, help=f"Address to listen on for pushed alerts and messages. Default: {PUSH_HOST}")
+        self.parser.add_argument("--push-port", type=int, default=PUSH_PORT, help=f"Port to listen on for pushed alerts and messages, 0 to disable. Default: {PUSH_PORT}")
 
     def run(self):
-        main(self.matrix)
+        if self.args.benchmark:
+            benchmark(self.matrix, self.args.benchmark)
+        else:
+            main(self.matrix, self.args.push_host, self.args.push_port, self.args.frame_stats)
 
 
 # Program entry point
@@ -406,6 +730,9 @@ if __name__ == "__main__":
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
+    # While still root, see load_icons()
+    load_icons()
+
     run_text = RunText()
     if (not run_text.process()):
         run_text.print_help()
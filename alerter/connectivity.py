@@ -0,0 +1,127 @@
+import logging
+import socket
+import struct
+import threading
+import time
+
+import ping3
+
+
+log = logging.getLogger(__name__)
+
+
+def default_gateway():
+    """
+    The IP address of the default route's gateway, or None if there isn't one
+    (or this isn't Linux)
+    """
+    try:
+        with open("/proc/net/route") as f:
+            for line in f.readlines()[1:]:
+                fields = line.split()
+                if fields[1] == "00000000" and int(fields[3], 16) & 2:
+                    return socket.inet_ntoa(struct.pack("<L", int(fields[2], 16)))
+    except (OSError, IndexError, ValueError):
+        pass
+
+    return None
+
+
+def replied(delay):
+    # A delay of 0.0 is still a reply
+    return delay is not None and delay is not False
+
+
+class ConnectivityMonitor(object):
+    """
+    Pings all of the hosts at once every interval seconds from a thread of its
+    own, and calls on_change(connected) whenever the verdict changes.
+
+    One round with a reply from any host counts as up.  The verdict only goes
+    down after down_after failed rounds in a row (and back up after up_after
+    good ones), so a single lost round doesn't flash an outage on the sign.
+    While a change is pending the rounds come every recheck_interval seconds
+    instead, so a real outage is still caught quickly.
+
+    The gateway is pinged along with the hosts, only to log whether it's the
+    local network or the internet that's down.
+    """
+    def __init__(self, hosts, on_change, interval=10, recheck_interval=2, timeout=2,
+                 down_after=3, up_after=2, connected=True):
+        self.hosts = tuple(hosts)
+        self.on_change = on_change
+        self.interval = interval
+        self.recheck_interval = recheck_interval
+        self.timeout = timeout
+        self.down_after = down_after
+        self.up_after = up_after
+
+        self.connected = connected
+        # Rounds in a row that disagreed with self.connected
+        self.streak = 0
+        self.pinger = None
+
+    def probe(self):
+        """
+        Run one round of pings, returning whether any of the hosts replied
+        """
+        if self.pinger is None:
+            self.pinger = ping3.Pinger(timeout=self.timeout)
+
+        gateway = default_gateway()
+        results = self.pinger.ping_many(self.hosts + ((gateway,) if gateway else ()))
+        if any(replied(results[host]) for host in self.hosts):
+            return True
+
+        if gateway:
+            gateway_status = "is" if replied(results[gateway]) else "is not"
+            log.info(f"{', '.join(self.hosts)} not reachable, the gateway ({gateway}) {gateway_status}")
+        else:
+            log.info(f"{', '.join(self.hosts)} not reachable, and there is no default gateway")
+        return False
+
+    def update(self, ok):
+        """
+        Count one round towards a change of verdict, calling on_change if it
+        changed.  Returns the seconds to wait before the next round
+        """
+        if ok == self.connected:
+            self.streak = 0
+            return self.interval
+
+        self.streak += 1
+        if self.streak < (self.up_after if ok else self.down_after):
+            return self.recheck_interval
+
+        self.connected = ok
+        self.streak = 0
+        log.info(f"Internet is {'up' if ok else 'down'}")
+        self.on_change(ok)
+        return self.interval
+
+    def run(self):
+        """
+        Probe forever - run this in a thread!
+        """
+        while True:
+            start = time.monotonic()
+            try:
+                ok = self.probe()
+            except OSError as e:
+                # Most likely no permission to open an ICMP socket, which says
+                # nothing about the internet, so leave the verdict alone
+                log.warning(f"Connectivity check failed: {e}")
+                time.sleep(self.interval)
+                continue
+            except Exception:
+                # Keep the thread alive, or the verdict would be stuck forever
+                log.exception("Connectivity check crashed")
+                time.sleep(self.interval)
+                continue
+
+            time.sleep(max(0, start + self.update(ok) - time.monotonic()))
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name="connectivity", daemon=True)
+        thread.start()
+        return thread
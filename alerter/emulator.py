@@ -0,0 +1,54 @@
+import logging
+
+from rgbmatrix import RGBMatrix
+
+
+log = logging.getLogger(__name__)
+
+
+class EmulatedMatrix(object):
+    """
+    Drop-in replacement for RGBMatrix that never touches the GPIO pins, so the
+    sign can be rendered (and profiled) on an ordinary Linux box.
+
+    The frame canvases are the library's normal in-memory framebuffers, so
+    drawing into them costs exactly what it does on the Pi.  There is no
+    refresh thread though, so SwapOnVSync() just flips the canvases straight
+    away instead of waiting for the next vsync.
+    """
+    def __init__(self, options):
+        options.do_gpio_init = False
+        # Nothing privileged happens without the GPIO, and dropping to
+        # 'daemon' would fail when we're not running as root anyway
+        options.drop_privileges = False
+
+        self.matrix = RGBMatrix(options=options)
+        self.front = None
+        self.swap_count = 0
+
+        log.info(f"Emulating a {self.width}x{self.height} matrix")
+
+    @property
+    def width(self):
+        return self.matrix.width
+
+    @property
+    def height(self):
+        return self.matrix.height
+
+    def CreateFrameCanvas(self):
+        return self.matrix.CreateFrameCanvas()
+
+    def SwapOnVSync(self, canvas, framerate_fraction=1):
+        """
+        Make canvas the "displayed" frame and hand back the previous one to
+        draw into, just like the real matrix does
+        """
+        previous = self.front
+        self.front = canvas
+        self.swap_count += 1
+
+        if previous is None:
+            previous = self.matrix.CreateFrameCanvas()
+
+        return previous
@@ -0,0 +1,70 @@
+import logging
+import time
+
+
+log = logging.getLogger(__name__)
+
+
+class FrameScheduler(object):
+    """
+    Paces the render loop against fixed monotonic deadlines.
+
+    Time spent drawing (and waiting for vsync) comes out of the frame period
+    instead of being added to it, so the frame rate doesn't drift when the
+    draw cost changes.  If we fall more than a whole frame behind, the
+    deadlines are re-anchored to now rather than trying to catch up with a
+    burst of frames.
+    """
+    def __init__(self, frame_period, report_every=60):
+        self.frame_period = frame_period
+        self.report_every = report_every
+
+        self.next_deadline = None
+        self.last_frame_time = None
+
+        # Counters since the last report
+        self.frames = 0
+        self.missed_deadlines = 0
+        self.last_report_time = None
+
+    def wait(self):
+        """
+        Sleep until the next frame is due and return the number of seconds
+        since the previous frame, which is what the scrollers should advance by
+        """
+        now = time.monotonic()
+
+        if self.next_deadline is None:
+            self.next_deadline = now + self.frame_period
+            self.last_frame_time = now
+            self.last_report_time = now
+            return 0.0
+
+        if now < self.next_deadline:
+            time.sleep(self.next_deadline - now)
+            now = time.monotonic()
+        else:
+            self.missed_deadlines += 1
+
+        self.next_deadline += self.frame_period
+        if self.next_deadline < now:
+            # Too far behind to ever catch up - start again from here
+            self.next_deadline = now + self.frame_period
+
+        elapsed = now - self.last_frame_time
+        self.last_frame_time = now
+        self.frames += 1
+
+        if now - self.last_report_time >= self.report_every:
+            self.report(now)
+
+        return elapsed
+
+    def report(self, now):
+        if self.missed_deadlines:
+            log.warning(f"Missed {self.missed_deadlines} of {self.frames} frame deadlines "
+                        f"in the last {now - self.last_report_time:.0f}s")
+
+        self.frames = 0
+        self.missed_deadlines = 0
+        self.last_report_time = now
@@ -0,0 +1,121 @@
+import gc
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+class Histogram(object):
+    """
+    Counts of durations in buckets of microseconds, 64 per power of two so
+    any duration lands in a bucket less than 1/64th wide.  Anything over a
+    second goes in the last bucket.
+    """
+    SUB_BITS = 6
+    SUB_BUCKETS = 1 << SUB_BITS
+    NUM_BUCKETS = 955  # The last one holds a second
+
+    def __init__(self):
+        self.counts = [0] * self.NUM_BUCKETS
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds):
+        us = int(seconds * 1000000)
+        if us < self.SUB_BUCKETS:
+            bucket = us
+        else:
+            shift = us.bit_length() - self.SUB_BITS - 1
+            bucket = (shift + 1) * self.SUB_BUCKETS + ((us >> shift) & (self.SUB_BUCKETS - 1))
+
+        self.counts[min(bucket, self.NUM_BUCKETS - 1)] += 1
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    @classmethod
+    def upper_bound(cls, bucket):
+        """
+        The end of a bucket, in seconds
+        """
+        if bucket < cls.SUB_BUCKETS:
+            return (bucket + 1) / 1000000
+        shift = bucket // cls.SUB_BUCKETS - 1
+        return ((cls.SUB_BUCKETS + bucket % cls.SUB_BUCKETS + 1) << shift) / 1000000
+
+    def percentile(self, percent):
+        """
+        The given percentile in seconds, interpolated linearly within the
+        bucket holding it as if its durations were spread evenly
+        """
+        wanted = self.count * percent / 100
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            if count and seen + count >= wanted:
+                lower = self.upper_bound(bucket - 1) if bucket else 0.0
+                upper = self.upper_bound(bucket)
+                return min(lower + (upper - lower) * (wanted - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def summary(self):
+        return (f"p50 {self.percentile(50) * 1000:.2f} p99 {self.percentile(99) * 1000:.2f} "
+                f"max {self.max * 1000:.2f}ms")
+
+    def reset(self):
+        self.counts = [0] * self.NUM_BUCKETS
+        self.count = 0
+        self.max = 0.0
+
+
+class FrameStats(object):
+    """
+    Per-phase frame timings, logged as one line every report_every seconds.
+
+    A frame overruns when the work in it (rendering and swapping) takes longer
+    than the frame period.  The number of garbage collections in each period
+    is logged too, as those are a likely cause of the odd slow frame.
+    """
+    PHASES = ("render", "sleep", "swap")
+
+    def __init__(self, frame_period, report_every=60):
+        self.frame_period = frame_period
+        self.report_every = report_every
+
+        self.histograms = {phase: Histogram() for phase in self.PHASES}
+        self.frames = 0
+        self.overruns = 0
+        self.elapsed = 0.0
+        self.gc_collections = self.count_collections()
+
+    @staticmethod
+    def count_collections():
+        return sum(generation["collections"] for generation in gc.get_stats())
+
+    def record(self, render, sleep, swap):
+        histograms = self.histograms
+        histograms["render"].add(render)
+        histograms["sleep"].add(sleep)
+        histograms["swap"].add(swap)
+
+        self.frames += 1
+        if render + swap > self.frame_period:
+            self.overruns += 1
+
+        self.elapsed += render + sleep + swap
+        if self.elapsed >= self.report_every:
+            self.report()
+
+    def report(self):
+        gc_collections = self.count_collections()
+
+        phases = " | ".join(f"{phase} {self.histograms[phase].summary()}" for phase in self.PHASES)
+        log.info(f"{self.frames} frames in {self.elapsed:.0f}s, {self.overruns} overran: {phases} | "
+                 f"{gc_collections - self.gc_collections} GCs")
+
+        for histogram in self.histograms.values():
+            histogram.reset()
+        self.frames = 0
+        self.overruns = 0
+        self.elapsed = 0.0
+        self.gc_collections = gc_collections
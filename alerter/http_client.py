@@ -0,0 +1,68 @@
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+log = logging.getLogger(__name__)
+
+
+class Endpoint(object):
+    """
+    A URL that gets polled over and over.
+
+    Requests go through a session of its own so the connection (and the TLS
+    session) is kept alive between polls, always with a timeout so a hung
+    server can't block the fetching thread forever.  The ETag and
+    Last-Modified of the last response passed to commit() are sent back, so a
+    payload that hasn't changed comes back as an empty 304.
+    """
+    def __init__(self, url, timeout):
+        self.url = url
+        # (connect, read) in seconds, as for requests
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.etag = None
+        self.last_modified = None
+
+    def fetch(self, timeout=None):
+        """
+        GET the URL and return the response, or None if it hasn't changed
+        since the last commit().  timeout overrides the endpoint's default
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        r = self.session.get(self.url, headers=headers, timeout=timeout or self.timeout)
+        if r.status_code == 304:
+            return None
+
+        # Until this one is committed, whatever comes next has to be a full
+        # response - the body might not be any good
+        self.etag = None
+        self.last_modified = None
+
+        return r
+
+    def forget(self):
+        """
+        Make the next fetch() get the whole payload, even if it hasn't changed
+        """
+        self.etag = None
+        self.last_modified = None
+
+    def commit(self, r):
+        """
+        Only ask for changes since the response r, once its body has been
+        used successfully
+        """
+        self.etag = r.headers.get("ETag")
+        self.last_modified = r.headers.get("Last-Modified")
@@ -0,0 +1,150 @@
+import glob
+import hashlib
+import logging
+import mmap
+import os
+import struct
+
+
+log = logging.getLogger(__name__)
+
+
+# Blob header: magic, width, height.  The RGB pixels follow, row by row
+HEADER = struct.Struct("<4sHH")
+MAGIC = b"RGB1"
+
+
+class IconBlob(object):
+    """
+    A prepared icon: raw RGB pixels, normally mapped straight from the cache
+    file so the pages belong to the page cache rather than to us
+    """
+    def __init__(self, data, source):
+        magic, self.width, self.height = HEADER.unpack_from(data)
+        if magic != MAGIC or len(data) < HEADER.size + self.width * self.height * 3:
+            raise ValueError(f"{source} is not a valid icon blob")
+
+        self.data = data
+        self.pixels = memoryview(data)[HEADER.size:]
+
+    @classmethod
+    def map(cls, path):
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            return cls(data, path)
+        except (ValueError, struct.error):
+            data.close()
+            raise ValueError(f"{path} is not a valid icon blob")
+
+    def draw(self, canvas, x, y=0):
+        canvas.SetPixelsBuffer(self.pixels, self.width, self.height, x, y)
+
+
+class IconCache(object):
+    """
+    Dimmed, panel-sized RGB versions of the PNG icons, built on first use and
+    kept in cache_dir keyed by a hash of the PNG and the settings used to
+    build them.
+
+    Call preload() at startup so that missing or stale blobs are built then,
+    and load() while rendering only looks up an already mapped blob.  After
+    the first run nothing is decoded at all - the blobs are just mmap()ed.
+    If cache_dir can't be written, the blobs are built in memory instead.
+    """
+    def __init__(self, icon_dir, cache_dir, brightness, max_height):
+        self.icon_dir = icon_dir
+        self.cache_dir = cache_dir
+        self.brightness = brightness
+        self.max_height = max_height
+        self.blobs = {}
+
+    def preload(self, names):
+        """
+        Build (if needed) and map the blobs for all the named icons, returning
+        the names of any that couldn't be loaded
+        """
+        failed = []
+        for name in names:
+            try:
+                self.load(name)
+            except (OSError, ValueError) as e:
+                log.error(f"Couldn't load icon {name}: {e}")
+                failed.append(name)
+
+        return failed
+
+    def load(self, name):
+        blob = self.blobs.get(name)
+        if blob is None:
+            blob = self.prepare(name)
+            self.blobs[name] = blob
+
+        return blob
+
+    def prepare(self, name):
+        """
+        Return the blob for the named icon, building it if needed
+        """
+        png_path = os.path.join(self.icon_dir, f"{name}.png")
+        with open(png_path, "rb") as f:
+            png = f.read()
+
+        digest = hashlib.sha1(png)
+        digest.update(f"{self.brightness}:{self.max_height}".encode())
+        blob_path = os.path.join(self.cache_dir, f"{name}-{digest.hexdigest()[:16]}.rgb")
+
+        if os.path.exists(blob_path):
+            return IconBlob.map(blob_path)
+
+        data = self.build(png_path)
+        try:
+            self.save(blob_path, data)
+        except OSError as e:
+            # e.g. after dropping root - the icon still works, it's just
+            # decoded again next time
+            log.warning(f"Couldn't cache icon blob {blob_path}: {e}")
+            return IconBlob(data, png_path)
+
+        # Blobs from older versions of the icon or other settings
+        for old_path in glob.glob(os.path.join(self.cache_dir, f"{name}-*.rgb")):
+            if old_path != blob_path:
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+
+        return IconBlob.map(blob_path)
+
+    def build(self, png_path):
+        """
+        Decode the PNG into the bytes of a blob
+        """
+        # Only needed when the cache is cold, so don't pay for importing it otherwise
+        from PIL import Image, ImageEnhance
+
+        log.info(f"Building icon blob for {png_path}")
+
+        image = Image.open(png_path).convert("RGBA")
+        image = image.crop((0, 0, image.width, min(image.height, self.max_height)))
+        image = ImageEnhance.Brightness(image).enhance(self.brightness)
+
+        # Transparent pixels become black, which is what SetImage() leaves
+        # behind when it skips them on a cleared canvas
+        rgb = Image.new("RGB", image.size)
+        rgb.paste(image, mask=image.getchannel("A").point(lambda a: 255 if a else 0))
+
+        return HEADER.pack(MAGIC, rgb.width, rgb.height) + rgb.tobytes()
+
+    def save(self, blob_path, data):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, blob_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,24 @@
+class CachedLayer(object):
+    """
+    An off-screen canvas holding something that changes far less often than
+    we draw frames, like the clock which only changes once a second.
+
+    render(canvas, *args) is only called when the key passed to draw()
+    changes.  Every other frame just copies the cached canvas over the one
+    being drawn, which also saves clearing it first.
+    """
+    def __init__(self, matrix, render):
+        self.canvas = matrix.CreateFrameCanvas()
+        self.render = render
+        self.key = None
+
+    def invalidate(self):
+        self.key = None
+
+    def draw(self, canvas, key, *args):
+        if key != self.key:
+            self.canvas.Clear()
+            self.render(self.canvas, *args)
+            self.key = key
+
+        canvas.CopyFrom(self.canvas)
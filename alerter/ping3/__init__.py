@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 
+import asyncio
 import os
 import socket
 import struct
@@ -11,6 +12,8 @@ import threading
 import logging
 import functools
 import errno
+import sys
+import types
 
 from . import errors
 from .enums import ICMP_DEFAULT_CODE, IcmpType, IcmpTimeExceededCode, IcmpDestinationUnreachableCode
@@ -19,11 +22,27 @@ __version__ = "4.0.8"
 DEBUG = False  # DEBUG: Show debug info for developers. (default False)
 EXCEPTIONS = False  # EXCEPTIONS: Raise exception when delay is not available.
 LOGGER = None  # LOGGER: Record logs into console or file. Logger object should have .debug() method.
+DNS_CACHE_TTL = 300  # DNS_CACHE_TTL: Seconds to reuse a resolved domain name for. 0 disables the cache. (default 300)
+DNS_NEGATIVE_TTL = 30  # DNS_NEGATIVE_TTL: Seconds to remember that a domain name could not be resolved. (default 30)
+DNS_USE_STALE = True  # DNS_USE_STALE: Keep using an expired address while the domain name cannot be resolved. (default True)
 
 IP_HEADER_FORMAT = "!BBHHHBBHII"
 ICMP_HEADER_FORMAT = "!BBHHH"  # According to netinet/ip_icmp.h. !=network byte order(big-endian), B=unsigned char, H=unsigned short
 ICMP_TIME_FORMAT = "!d"  # d=double
 SOCKET_SO_BINDTODEVICE = 25  # socket.SO_BINDTODEVICE
+IP_HEADER_STRUCT = struct.Struct(IP_HEADER_FORMAT)
+ICMP_HEADER_STRUCT = struct.Struct(ICMP_HEADER_FORMAT)
+ICMP_TIME_STRUCT = struct.Struct(ICMP_TIME_FORMAT)
+ECHO_CHECKSUM_STRUCT = ECHO_SEQ_STRUCT = struct.Struct("!H")  # The checksum and sequence fields of an echo request.
+ECHO_TIME_WORDS_STRUCT = struct.Struct("!4H")  # The time in an echo request, as 16-bit words for the checksum.
+ECHO_TEMPLATE_CACHE_SIZE = 64  # How many (icmp_id, size) echo request templates to keep.
+RECV_BUFFER_SIZE = 1500  # Single packet size limit is 65535 bytes, but usually the network packet limit is 1500 bytes.
+
+_traced_funcs = {}  # function name -> (function, function with call logging), see _func_logger()
+_echo_templates = {}  # (icmp_id, size) -> (template packet, ones' complement sum of its words), see _echo_template()
+_recv_buffers = threading.local()  # A receive buffer per thread, see _recv_buffer()
+_dns_cache = {}  # domain name -> (IP address or None if it could not be resolved, expiry time)
+_dns_cache_lock = threading.Lock()
 
 
 def _debug(*args) -> None:
@@ -68,11 +87,14 @@ def _raise(err: Exception) -> None:
 def _func_logger(func):
     """Decorator that log function calls for debug
 
+    The logging wrapper is only swapped in for the module level name of the function while `ping3.DEBUG` is True (see
+    `_set_debug()`). While it is False, the plain function is called and there is no wrapper in the way at all.
+
     Args:
         func (callable): Function to be decorated.
 
     Returns:
-        callable: Decorated function.
+        callable: Decorated function if `ping3.DEBUG` is True, otherwise the function itself.
     """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
@@ -84,7 +106,34 @@ def _func_logger(func):
         _debug("Function returned:", "{func.__name__} -> {rtrn}".format(func=func, rtrn=func_return))
         return func_return
 
-    return wrapper
+    _traced_funcs[func.__name__] = (func, wrapper)
+    return wrapper if DEBUG else func
+
+
+def _set_debug(enabled: bool) -> None:
+    """Turns the debug info on or off, swapping the function call logging in or out.
+
+    This is what assigning to `ping3.DEBUG` does. Note that a function imported with `from ping3 import ...` keeps
+    whichever version it was imported as.
+
+    Args:
+        enabled (bool): Whether to show debug info.
+    """
+    global DEBUG
+    DEBUG = bool(enabled)
+    for name, (func, wrapper) in _traced_funcs.items():
+        globals()[name] = wrapper if DEBUG else func
+
+
+class _Ping3Module(types.ModuleType):
+    """Lets `ping3.DEBUG = True` switch the debug info at runtime, wrappers and all."""
+    @property
+    def DEBUG(self) -> bool:
+        return DEBUG
+
+    @DEBUG.setter
+    def DEBUG(self, enabled: bool) -> None:
+        _set_debug(enabled)
 
 
 def checksum(source: bytes) -> int:
@@ -107,6 +156,99 @@ def checksum(source: bytes) -> int:
     return ~result & ((1 << BITS) - 1)  # Ensure 16-bit
 
 
+def _is_ip_address(dest_addr: str) -> bool:
+    """Whether the destination address is an IPv4 address in dotted decimal form, rather than a domain name.
+
+    Args:
+        dest_addr (str): The destination address.
+
+    Returns:
+        bool: True for an IP address.
+    """
+    try:
+        socket.inet_aton(dest_addr)
+    except OSError:
+        return False
+    return dest_addr.count(".") == 3  # inet_aton() also takes shorthands like "127.1"
+
+
+def resolve(dest_addr: str) -> str:
+    """Resolves a domain name into an IP address, using the DNS cache.
+
+    Addresses are reused for `ping3.DNS_CACHE_TTL` seconds and failures remembered for `ping3.DNS_NEGATIVE_TTL` seconds.
+    If `ping3.DNS_USE_STALE` is True, an expired address keeps being used while the resolver fails, so pings carry on
+    working when it's DNS that is down.
+
+    Args:
+        dest_addr (str): The destination address, can be an IP address or a domain name. Ex. "192.168.1.1"/"example.com"
+
+    Returns:
+        str: The IP address. IP addresses are returned unchanged.
+
+    Raises:
+        HostUnknown: If destination address is a domain name and cannot resolved.
+    """
+    if _is_ip_address(dest_addr):
+        return dest_addr
+    now = time.monotonic()
+    with _dns_cache_lock:
+        cached_addr, expiry = _dns_cache.get(dest_addr, (None, None))
+    if expiry is not None and now < expiry:
+        if cached_addr is None:
+            raise errors.HostUnknown(dest_addr=dest_addr)
+        return cached_addr
+    try:
+        ip_addr = socket.gethostbyname(dest_addr)  # Domain name will translated into IP address, and IP address leaves unchanged.
+    except socket.gaierror as err:
+        if DNS_USE_STALE and cached_addr is not None:
+            if DEBUG:
+                _debug("Cannot resolve '{}', reusing stale address".format(dest_addr), cached_addr)
+            entry = (cached_addr, now + DNS_NEGATIVE_TTL)  # Don't ask the resolver again straight away.
+        else:
+            entry = (None, now + DNS_NEGATIVE_TTL)
+        if DNS_CACHE_TTL > 0:
+            with _dns_cache_lock:
+                _dns_cache[dest_addr] = entry
+        if entry[0] is None:
+            raise errors.HostUnknown(dest_addr=dest_addr) from err
+        return entry[0]
+    if DNS_CACHE_TTL > 0:
+        with _dns_cache_lock:
+            _dns_cache[dest_addr] = (ip_addr, now + DNS_CACHE_TTL)
+    return ip_addr
+
+
+def clear_dns_cache() -> None:
+    """Forgets every cached domain name."""
+    with _dns_cache_lock:
+        _dns_cache.clear()
+
+
+def _recv_buffer() -> memoryview:
+    """The receive buffer of the current thread, allocated on first use.
+
+    Returns:
+        memoryview: A view of RECV_BUFFER_SIZE bytes to `recv_into()`.
+    """
+    try:
+        return _recv_buffers.view
+    except AttributeError:
+        _recv_buffers.view = memoryview(bytearray(RECV_BUFFER_SIZE))
+        return _recv_buffers.view
+
+
+def _has_ip_header(sock: socket.socket) -> bool:
+    """Whether packets received on the socket start with the IP header.
+
+    Args:
+        sock (socket.socket): Socket.
+
+    Returns:
+        bool: False when unprivileged on Linux, True otherwise.
+    """
+    return (os.name != 'posix') or (platform.system() == 'Darwin') or (sock.type == socket.SOCK_RAW)  # No IP Header when unprivileged on Linux.
+
+
 def read_icmp_header(raw: bytes) -> dict:
     """Get information from raw ICMP header data.
 
@@ -117,7 +259,7 @@ def read_icmp_header(raw: bytes) -> dict:
         dict: A map contains the infos from the raw header.
     """
     icmp_header_keys = ('type', 'code', 'checksum', 'id', 'seq')
-    return dict(zip(icmp_header_keys, struct.unpack(ICMP_HEADER_FORMAT, raw)))
+    return dict(zip(icmp_header_keys, ICMP_HEADER_STRUCT.unpack(raw)))
 
 
 def read_ip_header(raw: bytes) -> dict:
@@ -133,12 +275,81 @@ def read_ip_header(raw: bytes) -> dict:
         return ".".join(str(ip >> offset & 0xff) for offset in (24, 16, 8, 0))  # str(ipaddress.ip_address(ip))
 
     ip_header_keys = ('version', 'tos', 'len', 'id', 'flags', 'ttl', 'protocol', 'checksum', 'src_addr', 'dest_addr')
-    ip_header = dict(zip(ip_header_keys, struct.unpack(IP_HEADER_FORMAT, raw)))
+    ip_header = dict(zip(ip_header_keys, IP_HEADER_STRUCT.unpack(raw)))
     ip_header['src_addr'] = stringify_ip(ip_header['src_addr'])
     ip_header['dest_addr'] = stringify_ip(ip_header['dest_addr'])
     return ip_header
 
 
+def _ones_complement_sum(source: bytes) -> int:
+    """Ones' complement sum of the input as big-endian 16-bit words, padded with a zero byte if its length is odd.
+
+    Args:
+        source (Bytes): The input to be summed.
+
+    Returns:
+        int: The 16-bit sum.
+    """
+    if len(source) % 2:
+        source = bytes(source) + b"\x00"
+    result = sum(struct.unpack("!{}H".format(len(source) // 2), source))
+    while result >> 16:
+        result = (result & 0xffff) + (result >> 16)  # Each carry add to right most bit.
+    return result
+
+
+def _echo_template(icmp_id: int, size: int) -> tuple:
+    """Gets the echo request template for the ICMP id and payload size, building it the first time.
+
+    A template has zeroes for the checksum, sequence and time fields, so the sum of its words only needs the words of
+    those fields added to give the checksum of a real packet.
+
+    Args:
+        icmp_id (int): ICMP packet id.
+        size (int): The ICMP packet payload size in bytes.
+
+    Returns:
+        tuple: The template packet and the ones' complement sum of its words.
+    """
+    key = (icmp_id, size)
+    template = _echo_templates.get(key)
+    if template is None:
+        padding = (size - ICMP_TIME_STRUCT.size) * "Q"  # Using double to store current time.
+        packet = ICMP_HEADER_STRUCT.pack(IcmpType.ECHO_REQUEST, ICMP_DEFAULT_CODE, 0, icmp_id, 0) + bytes(ICMP_TIME_STRUCT.size) + padding.encode()
+        template = (packet, _ones_complement_sum(packet))
+        if len(_echo_templates) >= ECHO_TEMPLATE_CACHE_SIZE:
+            _echo_templates.clear()
+        _echo_templates[key] = template
+    return template
+
+
+def build_echo_request(icmp_id: int, seq: int, size: int) -> bytes:
+    """Builds an ICMP echo request packet carrying the current time.
+
+    The packet is a copy of a cached template with the sequence and time patched in, and its checksum is updated
+    incrementally from the template's (RFC1624) instead of being computed over the whole packet again.
+    RFC1624: https://tools.ietf.org/html/rfc1624
+
+    Args:
+        icmp_id (int): ICMP packet id.
+        seq (int): ICMP packet sequence.
+        size (int): The ICMP packet payload size in bytes.
+
+    Returns:
+        bytes: The ICMP header followed by the payload.
+    """
+    template, template_sum = _echo_template(icmp_id, size)
+    packet = bytearray(template)
+    ICMP_TIME_STRUCT.pack_into(packet, ICMP_HEADER_STRUCT.size, time.time())
+    # HC' = ~(~HC + ~m + m') with the old fields m all zero, i.e. the template's sum plus the new fields.
+    result = template_sum + seq + sum(ECHO_TIME_WORDS_STRUCT.unpack_from(packet, ICMP_HEADER_STRUCT.size))
+    while result >> 16:
+        result = (result & 0xffff) + (result >> 16)
+    ECHO_CHECKSUM_STRUCT.pack_into(packet, 2, ~result & 0xffff)
+    ECHO_SEQ_STRUCT.pack_into(packet, 6, seq)
+    return bytes(packet)
+
+
 @_func_logger
 def send_one_ping(sock: socket.socket, dest_addr: str, icmp_id: int, seq: int, size: int) -> None:
     """Sends one ping to the given destination.
@@ -155,24 +366,17 @@ def send_one_ping(sock: socket.socket, dest_addr: str, icmp_id: int, seq: int, s
         size (int): The ICMP packet payload size in bytes. Note this is only for the payload part.
 
     Raises:
-        HostUnkown: If destination address is a domain name and cannot resolved.
+        HostUnkown: If destination address is a domain name and cannot resolved. Resolved addresses are cached, see `resolve()`.
     """
-    _debug("Destination address: '{}'".format(dest_addr))
-    try:
-        dest_addr = socket.gethostbyname(dest_addr)  # Domain name will translated into IP address, and IP address leaves unchanged.
-    except socket.gaierror as err:
-        raise errors.HostUnknown(dest_addr=dest_addr) from err
-    _debug("Destination IP address:", dest_addr)
-    pseudo_checksum = 0  # Pseudo checksum is used to calculate the real checksum.
-    icmp_header = struct.pack(ICMP_HEADER_FORMAT, IcmpType.ECHO_REQUEST, ICMP_DEFAULT_CODE, pseudo_checksum, icmp_id, seq)
-    padding = (size - struct.calcsize(ICMP_TIME_FORMAT)) * "Q"  # Using double to store current time.
-    icmp_payload = struct.pack(ICMP_TIME_FORMAT, time.time()) + padding.encode()
-    real_checksum = checksum(icmp_header + icmp_payload)  # Calculates the checksum on the dummy header and the icmp_payload.
-    # Don't know why I need socket.htons() on real_checksum since ICMP_HEADER_FORMAT already in Network Bytes Order (big-endian)
-    icmp_header = struct.pack(ICMP_HEADER_FORMAT, IcmpType.ECHO_REQUEST, ICMP_DEFAULT_CODE, socket.htons(real_checksum), icmp_id, seq)  # Put real checksum into ICMP header.
-    _debug("Sent ICMP header:", read_icmp_header(icmp_header))
-    _debug("Sent ICMP payload:", icmp_payload)
-    packet = icmp_header + icmp_payload
+    if DEBUG:
+        _debug("Destination address: '{}'".format(dest_addr))
+    dest_addr = resolve(dest_addr)
+    if DEBUG:
+        _debug("Destination IP address:", dest_addr)
+    packet = build_echo_request(icmp_id=icmp_id, seq=seq, size=size)
+    if DEBUG:
+        _debug("Sent ICMP header:", read_icmp_header(packet[:struct.calcsize(ICMP_HEADER_FORMAT)]))
+        _debug("Sent ICMP payload:", packet[struct.calcsize(ICMP_HEADER_FORMAT):])
     sock.sendto(packet, (dest_addr, 0))  # addr = (ip, port). Port is 0 respectively the OS default behavior will be used.
 
 
@@ -200,60 +404,116 @@ def receive_one_ping(sock: socket.socket, icmp_id: int, seq: int, timeout: int):
         DestinationHostUnreachable: If the destination host is unreachable.
         DestinationUnreachable: If the destination is unreachable.
     """
-    has_ip_header = (os.name != 'posix') or (platform.system() == 'Darwin') or (sock.type == socket.SOCK_RAW)  # No IP Header when unprivileged on Linux.
-    if has_ip_header:
-        ip_header_slice = slice(0, struct.calcsize(IP_HEADER_FORMAT))  # [0:20]
-        icmp_header_slice = slice(ip_header_slice.stop, ip_header_slice.stop + struct.calcsize(ICMP_HEADER_FORMAT))  # [20:28]
-    else:
-        _debug("Unprivileged on Linux")
-        icmp_header_slice = slice(0, struct.calcsize(ICMP_HEADER_FORMAT))  # [0:8]
+    has_ip_header = _has_ip_header(sock)
+    icmp_offset = IP_HEADER_STRUCT.size if has_ip_header else 0  # [20:28] or [0:8]
+    payload_offset = icmp_offset + ICMP_HEADER_STRUCT.size
+    if not has_ip_header:  # When unprivileged on Linux, ICMP ID is rewrited by kernel.
+        if DEBUG:
+            _debug("Unprivileged on Linux")
+        icmp_id = sock.getsockname()[1]  # According to https://stackoverflow.com/a/14023878/4528364
+    buffer = _recv_buffer()  # Reused for every packet, and only parsed into dicts for errors and debug info.
     timeout_time = time.time() + timeout  # Exactly time when timeout.
-    _debug("Timeout time: {} ({})".format(time.ctime(timeout_time), timeout_time))
+    if DEBUG:
+        _debug("Timeout time: {} ({})".format(time.ctime(timeout_time), timeout_time))
     while True:
         timeout_left = timeout_time - time.time()  # How many seconds left until timeout.
         timeout_left = timeout_left if timeout_left > 0 else 0  # Timeout must be non-negative
-        _debug("Timeout left: {:.2f}s".format(timeout_left))
+        if DEBUG:
+            _debug("Timeout left: {:.2f}s".format(timeout_left))
         selected = select.select([sock, ], [], [], timeout_left)  # Wait until sock is ready to read or time is out.
         if selected[0] == []:  # Timeout
             raise errors.Timeout(timeout=timeout)
         time_recv = time.time()
-        _debug("Received time: {} ({}))".format(time.ctime(time_recv), time_recv))
-        recv_data, addr = sock.recvfrom(1500)  # Single packet size limit is 65535 bytes, but usually the network packet limit is 1500 bytes.
-        if has_ip_header:
-            ip_header_raw = recv_data[ip_header_slice]
-            ip_header = read_ip_header(ip_header_raw)
-            _debug("Received IP header:", ip_header)
-        else:
-            ip_header = None
-        icmp_header_raw, icmp_payload_raw = recv_data[icmp_header_slice], recv_data[icmp_header_slice.stop:]
-        icmp_header = read_icmp_header(icmp_header_raw)
-        _debug("Received ICMP header:", icmp_header)
-        _debug("Received ICMP payload:", icmp_payload_raw)
-        if not has_ip_header:  # When unprivileged on Linux, ICMP ID is rewrited by kernel.
-            icmp_id = sock.getsockname()[1]  # According to https://stackoverflow.com/a/14023878/4528364
-        if icmp_header['type'] == IcmpType.TIME_EXCEEDED:  # TIME_EXCEEDED has no icmp_id and icmp_seq. Usually they are 0.
-            if icmp_header['code'] == IcmpTimeExceededCode.TTL_EXPIRED:  # Windows raw socket cannot get TTL_EXPIRED. See https://stackoverflow.com/questions/43239862/socket-sock-raw-ipproto-icmp-cant-read-ttl-response.
+        recv_size = sock.recv_into(buffer)
+        if recv_size < payload_offset:
+            continue  # Too short to be an ICMP packet
+        recv_type, recv_code, _, recv_id, recv_seq = ICMP_HEADER_STRUCT.unpack_from(buffer, icmp_offset)
+        if DEBUG:
+            _debug("Received time: {} ({}))".format(time.ctime(time_recv), time_recv))
+            if has_ip_header:
+                _debug("Received IP header:", read_ip_header(buffer[:icmp_offset]))
+            _debug("Received ICMP header:", read_icmp_header(buffer[icmp_offset:payload_offset]))
+            _debug("Received ICMP payload:", bytes(buffer[payload_offset:recv_size]))
+        if recv_type == IcmpType.TIME_EXCEEDED:  # TIME_EXCEEDED has no icmp_id and icmp_seq. Usually they are 0.
+            ip_header = read_ip_header(buffer[:icmp_offset]) if has_ip_header else None
+            icmp_header = read_icmp_header(buffer[icmp_offset:payload_offset])
+            if recv_code == IcmpTimeExceededCode.TTL_EXPIRED:  # Windows raw socket cannot get TTL_EXPIRED. See https://stackoverflow.com/questions/43239862/socket-sock-raw-ipproto-icmp-cant-read-ttl-response.
                 raise errors.TimeToLiveExpired(ip_header=ip_header, icmp_header=icmp_header)  # Some router does not report TTL expired and then timeout shows.
             raise errors.TimeExceeded()
-        if icmp_header['type'] == IcmpType.DESTINATION_UNREACHABLE:  # DESTINATION_UNREACHABLE has no icmp_id and icmp_seq. Usually they are 0.
-            if icmp_header['code'] == IcmpDestinationUnreachableCode.DESTINATION_HOST_UNREACHABLE:
+        if recv_type == IcmpType.DESTINATION_UNREACHABLE:  # DESTINATION_UNREACHABLE has no icmp_id and icmp_seq. Usually they are 0.
+            ip_header = read_ip_header(buffer[:icmp_offset]) if has_ip_header else None
+            icmp_header = read_icmp_header(buffer[icmp_offset:payload_offset])
+            if recv_code == IcmpDestinationUnreachableCode.DESTINATION_HOST_UNREACHABLE:
                 raise errors.DestinationHostUnreachable(ip_header=ip_header, icmp_header=icmp_header)
             raise errors.DestinationUnreachable(ip_header=ip_header, icmp_header=icmp_header)
-        if icmp_header['id']:
-            if icmp_header['type'] == IcmpType.ECHO_REQUEST:  # filters out the ECHO_REQUEST itself.
-                _debug("ECHO_REQUEST received. Packet filtered out.")
+        if recv_id:
+            if recv_type == IcmpType.ECHO_REQUEST:  # filters out the ECHO_REQUEST itself.
+                if DEBUG:
+                    _debug("ECHO_REQUEST received. Packet filtered out.")
                 continue
-            if icmp_header['id'] != icmp_id:  # ECHO_REPLY should match the ICMP ID field.
-                _debug("ICMP ID dismatch. Packet filtered out.")
+            if recv_id != icmp_id:  # ECHO_REPLY should match the ICMP ID field.
+                if DEBUG:
+                    _debug("ICMP ID dismatch. Packet filtered out.")
                 continue
-            if icmp_header['seq'] != seq:  # ECHO_REPLY should match the ICMP SEQ field.
-                _debug("IMCP SEQ dismatch. Packet filtered out.")
+            if recv_seq != seq:  # ECHO_REPLY should match the ICMP SEQ field.
+                if DEBUG:
+                    _debug("IMCP SEQ dismatch. Packet filtered out.")
                 continue
-            if icmp_header['type'] == IcmpType.ECHO_REPLY:
-                time_sent = struct.unpack(ICMP_TIME_FORMAT, icmp_payload_raw[0:struct.calcsize(ICMP_TIME_FORMAT)])[0]
-                _debug("Received sent time: {} ({})".format(time.ctime(time_sent), time_sent))
+            if recv_type == IcmpType.ECHO_REPLY:
+                if recv_size < payload_offset + ICMP_TIME_STRUCT.size:  # The buffer is reused, so the rest would be stale.
+                    if DEBUG:
+                        _debug("ECHO_REPLY too short to hold the sent time. Packet filtered out.")
+                    continue
+                time_sent =ICMP_TIME_STRUCT.unpack_from(buffer, payload_offset)[0]
+                if DEBUG:
+                    _debug("Received sent time: {} ({})".format(time.ctime(time_sent), time_sent))
                 return time_recv - time_sent
-        _debug("Uncatched ICMP packet:", icmp_header)
+        if DEBUG:
+            _debug("Uncatched ICMP packet:", read_icmp_header(buffer[icmp_offset:payload_offset]))
+
+
+def _create_socket(src_addr: str = "", ttl=None, interface: str = "") -> socket.socket:
+    """Creates an ICMP socket, raw if permitted or an unprivileged datagram socket otherwise.
+
+    Args:
+        src_addr (str): The IP address to ping from. (default "")
+        ttl (int | None): The Time-To-Live of the outgoing packets. None means using OS default. (default None)
+        interface (str): LINUX ONLY. The gateway network interface to ping from. (default "")
+
+    Returns:
+        socket.socket: The ICMP socket.
+    """
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+    except PermissionError as err:
+        if err.errno == errno.EPERM:  # [Errno 1] Operation not permitted
+            if DEBUG:
+                _debug("`{}` when create socket.SOCK_RAW, using socket.SOCK_DGRAM instead.".format(err))
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        else:
+            raise err
+    if ttl:
+        try:  # IPPROTO_IP is for Windows and BSD Linux.
+            if sock.getsockopt(socket.IPPROTO_IP, socket.IP_TTL):
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+        except OSError as err:
+            if DEBUG:
+                _debug("Set Socket Option `IP_TTL` in `IPPROTO_IP` Failed: {}".format(err))
+        try:
+            if sock.getsockopt(socket.SOL_IP, socket.IP_TTL):
+                sock.setsockopt(socket.SOL_IP, socket.IP_TTL, ttl)
+        except OSError as err:
+            if DEBUG:
+                _debug("Set Socket Option `IP_TTL` in `SOL_IP` Failed: {}".format(err))
+    if interface:
+        sock.setsockopt(socket.SOL_SOCKET, SOCKET_SO_BINDTODEVICE, interface.encode())  # packets will be sent from specified interface.
+        if DEBUG:
+            _debug("Socket Interface Binded:", interface)
+    if src_addr:
+        sock.bind((src_addr, 0))  # only packets send to src_addr are received.
+        if DEBUG:
+            _debug("Socket Source Address Binded:", src_addr)
+    return sock
 
 
 @_func_logger
@@ -277,32 +537,8 @@ def ping(dest_addr: str, timeout: int = 4, unit: str = "s", src_addr: str = "",
     Raises:
         PingError: Any PingError will raise again if `ping3.EXCEPTIONS` is True.
     """
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
-    except PermissionError as err:
-        if err.errno == errno.EPERM:  # [Errno 1] Operation not permitted
-            _debug("`{}` when create socket.SOCK_RAW, using socket.SOCK_DGRAM instead.".format(err))
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
-        else:
-            raise err
+    sock = _create_socket(src_addr=src_addr, ttl=ttl, interface=interface)
     with sock:
-        if ttl:
-            try:  # IPPROTO_IP is for Windows and BSD Linux.
-                if sock.getsockopt(socket.IPPROTO_IP, socket.IP_TTL):
-                    sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
-            except OSError as err:
-                _debug("Set Socket Option `IP_TTL` in `IPPROTO_IP` Failed: {}".format(err))
-            try:
-                if sock.getsockopt(socket.SOL_IP, socket.IP_TTL):
-                    sock.setsockopt(socket.SOL_IP, socket.IP_TTL, ttl)
-            except OSError as err:
-                _debug("Set Socket Option `IP_TTL` in `SOL_IP` Failed: {}".format(err))
-        if interface:
-            sock.setsockopt(socket.SOL_SOCKET, SOCKET_SO_BINDTODEVICE, interface.encode())  # packets will be sent from specified interface.
-            _debug("Socket Interface Binded:", interface)
-        if src_addr:
-            sock.bind((src_addr, 0))  # only packets send to src_addr are received.
-            _debug("Socket Source Address Binded:", src_addr)
         thread_id = threading.get_native_id() if hasattr(threading, 'get_native_id') else threading.currentThread().ident  # threading.get_native_id() is supported >= python3.8.
         process_id = os.getpid()  # If ping() run under different process, thread_id may be identical.
         icmp_id = zlib.crc32("{}{}".format(process_id, thread_id).encode()) & 0xffff  # to avoid icmp_id collision.
@@ -310,11 +546,13 @@ def ping(dest_addr: str, timeout: int = 4, unit: str = "s", src_addr: str = "",
             send_one_ping(sock=sock, dest_addr=dest_addr, icmp_id=icmp_id, seq=seq, size=size)
             delay = receive_one_ping(sock=sock, icmp_id=icmp_id, seq=seq, timeout=timeout)  # in seconds
         except errors.Timeout as err:
-            _debug(err)
+            if DEBUG:
+                _debug(err)
             _raise(err)
             return None
         except errors.PingError as err:
-            _debug(err)
+            if DEBUG:
+                _debug(err)
             _raise(err)
             return False
         if delay is None:
@@ -324,6 +562,242 @@ def ping(dest_addr: str, timeout: int = 4, unit: str = "s", src_addr: str = "",
         return delay
 
 
+class Pinger:
+    """Pings many hosts at once from one long-lived socket.
+
+    Every echo request sent gets a sequence number of its own, so the replies from all of the hosts can be told apart
+    while waiting for them in a single `select` loop. Pinging N hosts takes one round trip instead of N.
+
+    Args:
+        timeout (float): Default time to wait for the replies, in seconds. (default 4)
+        unit (str): The unit of the returned delays. "s" for seconds, "ms" for milliseconds. (default "s")
+        src_addr (str): The IP address to ping from. (default "")
+        ttl (int | None): The Time-To-Live of the outgoing packets. None means using OS default. (default None)
+        size (int): The ICMP packet payload size in bytes. (default 56)
+        interface (str): LINUX ONLY. The gateway network interface to ping from. (default "")
+    """
+    def __init__(self, timeout: float = 4, unit: str = "s", src_addr: str = "", ttl=None, size: int = 56, interface: str = ""):
+        self.timeout = timeout
+        self.unit = unit
+        self.size = size
+        self.sock = _create_socket(src_addr=src_addr, ttl=ttl, interface=interface)
+        self.has_ip_header = _has_ip_header(self.sock)
+        self.buffer = memoryview(bytearray(RECV_BUFFER_SIZE))  # Reused for every packet received.
+        # When unprivileged on Linux the kernel rewrites the id, and only hands this socket its own replies anyway.
+        self.icmp_id = zlib.crc32("{}{}".format(os.getpid(), id(self)).encode()) & 0xffff
+        self.seq = 0
+        self.lock = threading.Lock()
+        self.async_lock = None  # Created by async_ping_many(), inside the event loop.
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        """Closes the socket."""
+        self.sock.close()
+
+    def ping_many(self, dest_addrs, timeout: float = None) -> dict:
+        """Sends one ping to each of the destination addresses and waits for all of the replies together.
+
+        Args:
+            dest_addrs (iterable[str]): The destination addresses, IP addresses or domain names.
+            timeout (float | None): Time to wait for the replies, in seconds. None means the Pinger's timeout. (default None)
+
+        Returns:
+            dict: Destination address -> the delay in seconds/milliseconds, False on error or None on timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        results = {}
+        pending = {}  # seq -> (dest_addr, time sent)
+        # Every lookup is done before the first ping goes out, so no round trip or timeout includes one.
+        targets = []  # (dest_addr, dest_ip)
+        for dest_addr in dest_addrs:
+            results[dest_addr] = None
+            try:
+                targets.append((dest_addr, resolve(dest_addr)))
+            except errors.HostUnknown as err:
+                if DEBUG:
+                    _debug(err)
+                results[dest_addr] = False
+        with self.lock:
+            for dest_addr, dest_ip in targets:
+                self._send(dest_addr, dest_ip, pending, results)
+            timeout_time = time.perf_counter() + timeout
+            while pending:
+                timeout_left = timeout_time - time.perf_counter()
+                if timeout_left <= 0 or not select.select([self.sock, ], [], [], timeout_left)[0]:
+                    break
+                self._receive(pending, results)
+        for dest_addr, _ in pending.values():
+            if DEBUG:
+                _debug(errors.Timeout(timeout=timeout), "(Host='{}')".format(dest_addr))
+        return results
+
+    async def async_ping_many(self, dest_addrs, timeout: float = None) -> dict:
+        """Like `ping_many()`, but waits for the replies on the running event loop instead of blocking.
+
+        The socket is registered with the loop's `add_reader()` and the timeout is a loop timer. Domain names that are
+        not in the DNS cache are resolved together in the loop's default executor, before anything is sent. Calls on one
+        Pinger take turns, and a Pinger should not be used from a thread and a loop at the same time.
+
+        Args:
+            dest_addrs (iterable[str]): The destination addresses, IP addresses or domain names.
+            timeout (float | None): Time to wait for the replies, in seconds. None means the Pinger's timeout. (default None)
+
+        Returns:
+            dict: Destination address -> the delay in seconds/milliseconds, False on error or None on timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        if self.async_lock is None:
+            self.async_lock = asyncio.Lock()
+        results = {}
+        pending = {}  # seq -> (dest_addr, time sent)
+
+        async def lookup(dest_addr: str) -> str:
+            return dest_addr if _is_ip_address(dest_addr) else await loop.run_in_executor(None, resolve, dest_addr)
+
+        # Every lookup is done, all at once, before the first ping goes out, so no round trip or timeout includes one.
+        dest_addrs = list(dest_addrs)
+        targets = []  # (dest_addr, dest_ip)
+        for dest_addr, dest_ip in zip(dest_addrs, await asyncio.gather(*map(lookup, dest_addrs), return_exceptions=True)):
+            results[dest_addr] = None
+            if isinstance(dest_ip, errors.HostUnknown):
+                if DEBUG:
+                    _debug(dest_ip)
+                results[dest_addr] = False
+            elif isinstance(dest_ip, BaseException):
+                raise dest_ip
+            else:
+                targets.append((dest_addr, dest_ip))
+        async with self.async_lock:
+            for dest_addr, dest_ip in targets:
+                self._send(dest_addr, dest_ip, pending, results)
+            if pending:
+                done = loop.create_future()
+
+                def on_readable():
+                    try:
+                        self._receive(pending, results)
+                    except BlockingIOError:
+                        return
+                    except OSError as err:
+                        if not done.done():
+                            done.set_exception(err)
+                        return
+                    if not pending and not done.done():
+                        done.set_result(None)
+
+                def on_timeout():
+                    if not done.done():
+                        done.set_result(None)
+
+                self.sock.setblocking(False)
+                loop.add_reader(self.sock, on_readable)
+                timer = loop.call_later(timeout, on_timeout)
+                try:
+                    await done
+                finally:
+                    timer.cancel()
+                    loop.remove_reader(self.sock)
+                    self.sock.setblocking(True)
+        for dest_addr, _ in pending.values():
+            if DEBUG:
+                _debug(errors.Timeout(timeout=timeout), "(Host='{}')".format(dest_addr))
+        return results
+
+    def _send(self, dest_addr: str, dest_ip: str, pending: dict, results: dict) -> None:
+        """Sends an echo request with the next sequence number and adds it to the pending pings.
+
+        Args:
+            dest_addr (str): The destination address, as the results are keyed.
+            dest_ip (str): Its IP address.
+            pending (dict): seq -> (dest_addr, time sent) of the pings still waiting for a reply.
+            results (dict): The results being collected, where a failure to send is recorded.
+        """
+        self.seq = (self.seq + 1) & 0xffff
+        packet = build_echo_request(icmp_id=self.icmp_id, seq=self.seq, size=self.size)
+        try:
+            self.sock.sendto(packet, (dest_ip, 0))
+        except OSError as err:
+            if DEBUG:
+                _debug("Sending to {} failed: {}".format(dest_addr, err))
+            results[dest_addr] = False
+            return
+        pending[self.seq] = (dest_addr, time.perf_counter())
+
+    def _receive(self, pending: dict, results: dict) -> None:
+        """Reads one packet from the socket and records the result of the ping it answers, if any.
+
+        Args:
+            pending (dict): seq -> (dest_addr, time sent) of the pings still waiting for a reply.
+            results (dict): The results being collected by `ping_many()`.
+        """
+        buffer = self.buffer
+        recv_size = self.sock.recv_into(buffer)
+        time_recv = time.perf_counter()
+        icmp_offset = IP_HEADER_STRUCT.size if self.has_ip_header else 0
+        if recv_size < icmp_offset + ICMP_HEADER_STRUCT.size:
+            return  # Too short to be an ICMP packet
+        recv_type, _, _, recv_id, recv_seq = ICMP_HEADER_STRUCT.unpack_from(buffer, icmp_offset)
+        if recv_type == IcmpType.ECHO_REPLY:
+            if self.has_ip_header and recv_id != self.icmp_id:
+                return  # A reply to somebody else's ping
+            if recv_seq not in pending:
+                return  # Too late, or a duplicate
+            dest_addr, time_sent = pending.pop(recv_seq)
+            delay = time_recv - time_sent
+            results[dest_addr] = delay * 1000 if self.unit == "ms" else delay
+        elif recv_type == IcmpType.TIME_EXCEEDED or recv_type == IcmpType.DESTINATION_UNREACHABLE:
+            # The error carries the IP header and the first 8 bytes of the packet that caused it, i.e. our ICMP header.
+            inner_ip_offset = icmp_offset + ICMP_HEADER_STRUCT.size
+            if recv_size <= inner_ip_offset:
+                return
+            inner_icmp_offset = inner_ip_offset + (buffer[inner_ip_offset] & 0x0f) * 4
+            if recv_size < inner_icmp_offset + ICMP_HEADER_STRUCT.size:
+                return
+            _, _, _, inner_id, inner_seq = ICMP_HEADER_STRUCT.unpack_from(buffer, inner_icmp_offset)
+            if inner_id != self.icmp_id or inner_seq not in pending:
+                return
+            dest_addr, _ = pending.pop(inner_seq)
+            if DEBUG:
+                _debug("ICMP error for {}:".format(dest_addr), read_icmp_header(buffer[icmp_offset:inner_ip_offset]))
+            results[dest_addr] = False
+
+
+async def async_ping_many(dest_addrs, timeout: float = 4, unit: str = "s", src_addr: str = "", ttl=None, size: int = 56, interface: str = "") -> dict:
+    """
+    Send one ping to each of the destination addresses at once and wait for the replies without blocking the event loop.
+
+    Args:
+        dest_addrs (iterable[str]): The destination addresses, IP addresses or domain names.
+        And all the other arguments available in ping() except `seq`.
+
+    Returns:
+        dict: Destination address -> the delay in seconds/milliseconds, False on error or None on timeout.
+    """
+    with Pinger(timeout=timeout, unit=unit, src_addr=src_addr, ttl=ttl, size=size, interface=interface) as pinger:
+        return await pinger.async_ping_many(dest_addrs)
+
+
+async def async_ping(dest_addr: str, timeout: float = 4, unit: str = "s", src_addr: str = "", ttl=None, size: int = 56, interface: str = ""):
+    """
+    Send one ping to destination address and wait for the reply without blocking the event loop.
+
+    Args:
+        dest_addr (str): The destination address, can be an IP address or a domain name. Ex. "192.168.1.1"/"example.com"
+        And all the other arguments available in ping() except `seq`.
+
+    Returns:
+        float | None | False: The delay in seconds/milliseconds, False on error and None on timeout. Unlike ping(), errors are never raised, whatever `ping3.EXCEPTIONS` is.
+    """
+    results = await async_ping_many([dest_addr], timeout=timeout, unit=unit, src_addr=src_addr, ttl=ttl, size=size, interface=interface)
+    return results[dest_addr]
+
+
 @_func_logger
 def verbose_ping(dest_addr: str, count: int = 4, interval: float = 0, *args, **kwargs):
     """
@@ -357,3 +831,6 @@ def verbose_ping(dest_addr: str, count: int = 4, interval: float = 0, *args, **k
         else:
             print("{value}{unit}".format(value=int(delay), unit=unit))
         i += 1
+
+
+sys.modules[__name__].__class__ = _Ping3Module
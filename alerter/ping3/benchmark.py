@@ -0,0 +1,46 @@
+"""Microbenchmark of the debug tracing overhead with `ping3.DEBUG` off.
+
+Pings 127.0.0.1 over and over, first with the plain functions that ping3 uses while DEBUG is off, then with the call
+logging wrappers forced in but DEBUG still off - which is what every call paid before the wrappers became switchable.
+
+Run with `python -m ping3.benchmark [COUNT]`. Needs permission to send ICMP, like ping3 itself.
+"""
+import sys
+import time
+
+import ping3
+
+
+def time_pings(count: int) -> float:
+    """Pings 127.0.0.1 `count` times and returns the best time per ping in seconds, out of 5 rounds."""
+    best = None
+    for _ in range(5):
+        start = time.perf_counter()
+        for i in range(count):
+            ping3.ping("127.0.0.1", timeout=1, seq=i & 0xffff)
+        elapsed = (time.perf_counter() - start) / count
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(count: int = 2000) -> None:
+    ping3.DEBUG = False
+    module_vars = vars(ping3)
+
+    plain = time_pings(count)
+
+    # DEBUG off, but the wrappers in place anyway
+    for name, (func, wrapper) in ping3._traced_funcs.items():
+        module_vars[name] = wrapper
+    try:
+        wrapped = time_pings(count)
+    finally:
+        ping3.DEBUG = False  # Puts the plain functions back
+
+    print("{:<32}{:8.2f}us".format("ping() with DEBUG off:", plain * 1e6))
+    print("{:<32}{:8.2f}us".format("ping() with wrappers, no log:", wrapped * 1e6))
+    print("{:<32}{:8.2f}us per ping".format("Tracing overhead saved:", (wrapped - plain) * 1e6))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
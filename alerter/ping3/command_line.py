@@ -1,6 +1,7 @@
 import argparse
 
 import ping3
+from ping3.monitor import monitor
 
 
 def main(assigned_args = None) -> None:
@@ -16,21 +17,35 @@ def main(assigned_args = None) -> None:
     parser = argparse.ArgumentParser(prog="ping3", description="A pure python3 version of ICMP ping implementation using raw socket.", epilog="!!Note: ICMP messages can only be sent from processes running as root.")
     parser.add_argument("-v", "--version", action="version", version=ping3.__version__)
     parser.add_argument(dest="dest_addr", metavar="DEST_ADDR", nargs="*", default=("example.com", "8.8.8.8"), help="The destination address, can be an IP address or a domain name. Ex. 192.168.1.1/example.com.")
-    parser.add_argument("-c", "--count", dest="count", metavar="COUNT", type=int, default=4, help="How many pings should be sent. Default is 4.")
+    parser.add_argument("-c", "--count", dest="count", metavar="COUNT", type=int, default=None, help="How many pings should be sent. Default is 4, or until stopped with --monitor.")
     parser.add_argument("-t", "--timeout", dest="timeout", metavar="TIMEOUT", type=float, default=4, help="Time to wait for a response, in seconds. Default is 4.")
-    parser.add_argument("-i", "--interval", dest="interval", metavar="INTERVAL", type=float, default=0, help="Time to wait between each packet, in seconds. Default is 0.")
+    parser.add_argument("-i", "--interval", dest="interval", metavar="INTERVAL", type=float, default=None, help="Time to wait between each packet, in seconds. Default is 0, or 1 with --monitor, which needs it to be above 0.")
     parser.add_argument("-I", "--interface", dest="interface", metavar="INTERFACE", default="", help="LINUX ONLY. The gateway network interface to ping from. Default is None.")
     parser.add_argument("-S", "--src", dest="src_addr", metavar="SRC_ADDR", default="", help="The IP address to ping from. This is for multiple network interfaces. Default is None")
     parser.add_argument("-T", "--ttl", dest="ttl", metavar="TTL", type=int, default=64, help="The Time-To-Live of the outgoing packet. Default is 64.")
     parser.add_argument("-s", "--size", dest="size", metavar="SIZE", type=int, default=56, help="The ICMP packet payload size in bytes. Default is 56.")
+    parser.add_argument("--dns-ttl", dest="dns_ttl", metavar="DNS_TTL", type=float, default=ping3.DNS_CACHE_TTL, help="Seconds to reuse a resolved domain name for, 0 to resolve it for every packet. Default is {}.".format(ping3.DNS_CACHE_TTL))
+    parser.add_argument("-m", "--monitor", action="store_true", dest="monitor", help="Ping all of the destination addresses together every INTERVAL and print rolling statistics of each instead of every reply.")
+    parser.add_argument("--report-every", dest="report_every", metavar="SECONDS", type=float, default=10, help="With --monitor, time between the printed statistics, in seconds. Default is 10.")
+    parser.add_argument("--window", dest="window", metavar="PROBES", type=int, default=100, help="With --monitor, how many of the latest probes of each host the statistics cover. Default is 100.")
+    parser.add_argument("--json", action="store_true", dest="json", help="With --monitor, print the statistics as one JSON object per line.")
     parser.add_argument("-D", "--debug", action="store_true", dest="debug", help="Turn on DEBUG mode.")
     parser.add_argument("-E", "--exceptions", action="store_true", dest="exceptions", help="Turn on EXCEPTIONS mode.")
     args = parser.parse_args(assigned_args)
     ping3.DEBUG = args.debug
     ping3.EXCEPTIONS = args.exceptions
-
+    ping3.DNS_CACHE_TTL = args.dns_ttl
+
+    if args.monitor:
+        if args.interval is not None and args.interval <= 0:
+            parser.error("--monitor needs an INTERVAL above 0.")
+        interval = 1 if args.interval is None else args.interval
+        monitor(args.dest_addr, interval=interval, count=args.count or 0, report_every=args.report_every, window=args.window, output_json=args.json, timeout=min(args.timeout, interval), ttl=args.ttl, size=args.size, interface=args.interface, src_addr=args.src_addr)
+        return
+    count = 4 if args.count is None else args.count
+    interval = args.interval or 0
     for addr in args.dest_addr:
-        ping3.verbose_ping(addr, count=args.count, ttl=args.ttl, timeout=args.timeout, size=args.size, interval=args.interval, interface=args.interface, src_addr=args.src_addr)
+        ping3.verbose_ping(addr, count=count, ttl=args.ttl, timeout=args.timeout, size=args.size, interval=interval, interface=args.interface, src_addr=args.src_addr)
 
 
 if __name__ == "__main__":
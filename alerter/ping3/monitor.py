@@ -0,0 +1,163 @@
+"""Continuous monitoring of many hosts at once, with rolling statistics.
+
+Every `interval` seconds one ping goes out to each host from a single `Pinger`, and the results go into a fixed-size
+window per host. Nothing grows with the number of probes sent, so a monitor can be left running for weeks.
+"""
+import array
+import json
+import math
+import time
+
+import ping3
+
+
+class RollingStats:
+    """Round trip statistics over the last `window` probes of one host, plus totals since the start.
+
+    The delays are kept in a ring buffer of doubles, with NaN for a probe that got no reply, so the memory used is fixed
+    by the window size. The min/avg/max/mdev and percentiles are worked out from the window when asked for.
+
+    Args:
+        window (int): How many of the latest probes the rolling statistics cover. (default 100)
+    """
+    def __init__(self, window: int = 100):
+        if window < 1:
+            raise ValueError("The window must hold at least one probe, not {}.".format(window))
+        self.delays = array.array("d", bytes(8 * window))
+        self.window = window
+        self.next = 0  # Where the next delay goes in the ring buffer.
+        self.filled = 0  # How many of the slots hold a delay, until the ring buffer wraps around.
+        self.total_sent = 0
+        self.total_received = 0
+
+    def add(self, delay) -> None:
+        """Records the result of one probe.
+
+        Args:
+            delay (float | None | False): The delay in seconds, or None/False for a probe that got no reply.
+        """
+        self.total_sent += 1
+        if delay is None or delay is False:
+            delay = math.nan
+        else:
+            self.total_received += 1
+        self.delays[self.next] = delay
+        self.next = (self.next + 1) % self.window
+        if self.filled < self.window:
+            self.filled += 1
+
+    def summary(self, percentiles=(50, 90, 99)) -> dict:
+        """The statistics over the window.
+
+        Args:
+            percentiles (iterable[float]): The percentiles of the delays to include. (default (50, 90, 99))
+
+        Returns:
+            dict: "sent", "received" and "loss" (in percent) over the window, "total_sent" and "total_received" since
+                the start, and "min", "avg", "max", "mdev" and "p<percentile>" of the delays in milliseconds. The delay
+                statistics are None while the window holds no reply.
+        """
+        received = sorted(delay * 1000 for delay in self.delays[:self.filled] if delay == delay)  # NaN != NaN
+        stats = {
+            "sent": self.filled,
+            "received": len(received),
+            "loss": 100 * (self.filled - len(received)) / self.filled if self.filled else 0.0,
+            "total_sent": self.total_sent,
+            "total_received": self.total_received,
+        }
+        if received:
+            avg = math.fsum(received) / len(received)
+            stats["min"] = received[0]
+            stats["avg"] = avg
+            stats["max"] = received[-1]
+            stats["mdev"] = math.sqrt(math.fsum((delay - avg) ** 2 for delay in received) / len(received))
+            for percentile in percentiles:
+                rank = max(math.ceil(len(received) * percentile / 100), 1)  # Nearest rank
+                stats["p{:g}".format(percentile)] = received[rank - 1]
+        else:
+            for key in ("min", "avg", "max", "mdev"):
+                stats[key] = None
+            for percentile in percentiles:
+                stats["p{:g}".format(percentile)] = None
+        return stats
+
+
+def format_summary(dest_addr: str, stats: dict) -> str:
+    """Formats the statistics of a host as one line, in the manner of ping's closing summary.
+
+    Args:
+        dest_addr (str): The destination address.
+        stats (dict): Its statistics, from `RollingStats.summary()`.
+
+    Returns:
+        str: The formatted line.
+    """
+    text = "{}: {} sent, {} received, {:.1f}% loss".format(dest_addr, stats["sent"], stats["received"], stats["loss"])
+    if stats["avg"] is None:
+        return text
+    text += ", rtt min/avg/max/mdev = {min:.3f}/{avg:.3f}/{max:.3f}/{mdev:.3f} ms".format(**stats)
+    percentiles = [key for key in stats if key.startswith("p")]
+    text += ", {} = {} ms".format("/".join(percentiles), "/".join("{:.3f}".format(stats[key]) for key in percentiles))
+    return text
+
+
+def monitor(dest_addrs, interval: float = 1, count: int = 0, report_every: float = 10, window: int = 100, output_json: bool = False, timeout: float = None, **kwargs) -> dict:
+    """Pings all of the destination addresses together every `interval` seconds and prints their statistics now and then.
+
+    Every round's pings go out at once from one `Pinger`, so the round takes one round trip whatever the number of
+    hosts. The rounds keep to a fixed schedule, and a round that runs late skips the ticks it missed rather than bunching
+    up. Stops after `count` rounds, or on Ctrl-C, and prints the statistics a last time.
+
+    Args:
+        dest_addrs (iterable[str]): The destination addresses, IP addresses or domain names.
+        interval (float): Seconds from the start of one round to the start of the next. (default 1)
+        count (int): How many rounds to run. 0 means until stopped. (default 0)
+        report_every (float): Seconds between the printed statistics. (default 10)
+        window (int): How many of the latest probes of each host the statistics cover. (default 100)
+        output_json (bool): Print one JSON object per host and report instead of a line of text. (default False)
+        timeout (float | None): Time to wait for the replies of a round, in seconds. None means the interval. (default None)
+        **kwargs (any): Passed on to the `Pinger`: src_addr, ttl, size and interface.
+
+    Returns:
+        dict: Destination address -> its `RollingStats`.
+    """
+    dest_addrs = list(dict.fromkeys(dest_addrs))  # Each host once, in order.
+    stats = {dest_addr: RollingStats(window) for dest_addr in dest_addrs}
+    timeout = interval if timeout is None else min(timeout, interval)
+
+    def report() -> None:
+        now = time.time()
+        for dest_addr, host_stats in stats.items():
+            summary = host_stats.summary()
+            if output_json:
+                print(json.dumps(dict(time=round(now, 3), host=dest_addr, **summary)), flush=True)
+            else:
+                print(format_summary(dest_addr, summary), flush=True)
+
+    with ping3.Pinger(timeout=timeout, **kwargs) as pinger:
+        start = next_round = next_report = time.monotonic()
+        next_report += report_every
+        rounds = 0
+        reported = False  # Whether the latest round printed the statistics.
+        try:
+            while rounds < count or count == 0:
+                for dest_addr, delay in pinger.ping_many(dest_addrs).items():
+                    stats[dest_addr].add(delay)
+                rounds += 1
+
+                now = time.monotonic()
+                reported = now >= next_report
+                if reported:
+                    report()
+                    next_report += report_every * (math.floor((now - next_report) / report_every) + 1)
+                if rounds == count:
+                    break
+                next_round += interval
+                if next_round < now:  # Running late: skip to the next tick to come.
+                    next_round = start + interval * math.ceil((now - start) / interval)
+                time.sleep(next_round - now)
+        except KeyboardInterrupt:
+            reported = False
+    if not reported:
+        report()
+    return stats
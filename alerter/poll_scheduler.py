@@ -0,0 +1,95 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+log = logging.getLogger(__name__)
+
+
+class DataSource(object):
+    """
+    Something polled by a PollScheduler.
+
+    fetch(timeout) is called every interval seconds (give or take jitter, a
+    fraction of the interval) and should merge whatever it gets into the
+    display state itself.  If it raises, the wait before the next try doubles
+    each time, up to max_backoff seconds, until it succeeds again.
+    """
+    def __init__(self, name, fetch, interval, timeout, jitter=0.1, max_backoff=300):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.timeout = timeout
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+
+        self.failures = 0
+        self.next_due = 0
+        self.running = False
+
+    def finished(self, ok, now):
+        """
+        Work out when the next poll is due, after one that finished at now
+        """
+        if ok:
+            self.failures = 0
+            delay = self.interval
+        else:
+            self.failures += 1
+            delay = min(self.interval * 2 ** self.failures, self.max_backoff)
+
+        delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        self.next_due = now + delay
+
+        return delay
+
+
+class PollScheduler(object):
+    """
+    Polls every source on its own schedule from one thread, with the fetches
+    themselves running in a pool so a slow source never delays another
+    """
+    def __init__(self, sources):
+        self.sources = sources
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="poll")
+
+    def run(self):
+        """
+        Poll forever - run this in a thread!
+        """
+        with self.condition:
+            now = time.monotonic()
+            for source in self.sources:
+                source.next_due = now
+
+            while True:
+                now = time.monotonic()
+                for source in self.sources:
+                    if not source.running and source.next_due <= now:
+                        source.running = True
+                        self.executor.submit(self.poll, source)
+
+                waiting = [source.next_due for source in self.sources if not source.running]
+                self.condition.wait(max(0, min(waiting) - now) if waiting else None)
+
+    def poll(self, source):
+        try:
+            source.fetch(source.timeout)
+            ok = True
+        except Exception as e:
+            ok = False
+            if source.failures == 0:
+                log.exception(f"Exception polling {source.name}: {e}")
+            else:
+                log.warning(f"Polling {source.name} failed again: {e}")
+
+        with self.condition:
+            delay = source.finished(ok, time.monotonic())
+            source.running = False
+            self.condition.notify()
+
+        if not ok:
+            log.info(f"Next {source.name} poll in {delay:.0f}s")
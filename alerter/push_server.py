@@ -0,0 +1,52 @@
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+log = logging.getLogger(__name__)
+
+
+class PushHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        route = self.server.routes.get(self.path)
+        if route is None:
+            self.send_error(404)
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            route(json.loads(self.rfile.read(length)))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.send_error(400, f"Bad payload: {e}")
+            return
+
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        log.debug(f"{self.address_string()} {format % args}")
+
+
+class PushServer(ThreadingHTTPServer):
+    """
+    A tiny HTTP server that lets whoever sets an alert push it straight to
+    the sign instead of waiting for the next poll.
+
+    routes maps a path to a function taking the decoded JSON body of a POST
+    to it.  Bad JSON (or a route raising ValueError, KeyError, TypeError or
+    AttributeError on a bad payload) gets a 400, anything else a 204.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, routes):
+        super(PushServer, self).__init__(address, PushHandler)
+        self.routes = routes
+
+    def start(self):
+        host, port = self.server_address[:2]
+        log.info(f"Listening for pushed updates on {host}:{port}")
+
+        thread = threading.Thread(target=self.serve_forever, name="push", daemon=True)
+        thread.start()
+        return thread
@@ -5,6 +5,7 @@ import os
 
 sys.path.append(os.path.abspath(os.path.dirname(__file__) + '/../bindings/python'))
 from rgbmatrix import RGBMatrix, RGBMatrixOptions
+from emulator import EmulatedMatrix
 
 
 class SampleBase(object):
@@ -29,6 +30,7 @@ class SampleBase(object):
         self.parser.add_argument("--led-multiplexing", action="store", help="Multiplexing type: 0=direct; 1=strip; 2=checker; 3=spiral; 4=ZStripe; 5=ZnMirrorZStripe; 6=coreman; 7=Kaler2Scan; 8=ZStripeUneven... (Default: 0)", default=0, type=int)
         self.parser.add_argument("--led-panel-type", action="store", help="Needed to initialize special panels. Supported: 'FM6126A'", default="", type=str)
         self.parser.add_argument("--led-no-drop-privs", dest="drop_privileges", help="Don't drop privileges from 'root' after initializing the hardware.", action='store_false')
+        self.parser.add_argument("--led-emulate", action="store_true", help="Render into an in-memory matrix instead of driving the GPIO pins (no Raspberry Pi needed)")
         self.parser.set_defaults(drop_privileges=True)
 
     def usleep(self, value):
@@ -68,7 +70,10 @@ class SampleBase(object):
         if not self.args.drop_privileges:
           options.drop_privileges=False
 
-        self.matrix = RGBMatrix(options = options)
+        if self.args.led_emulate:
+            self.matrix = EmulatedMatrix(options)
+        else:
+            self.matrix = RGBMatrix(options = options)
 
         try:
             # Start loop
@@ -0,0 +1,184 @@
+from collections import OrderedDict
+
+
+# Same limit as kMaxFontWidth in lib/bdf-font.cc
+MAX_GLYPH_WIDTH = 196
+UNICODE_REPLACEMENT_CODEPOINT = 0xFFFD
+
+
+class Glyph(object):
+    __slots__ = ("device_width", "height", "y_offset", "bitmap")
+
+    def __init__(self, device_width, height, y_offset):
+        self.device_width = device_width
+        self.height = height
+        self.y_offset = y_offset
+        # One int per row, left aligned to MAX_GLYPH_WIDTH bits
+        self.bitmap = []
+
+
+class BdfFont(object):
+    """
+    Glyph bitmaps of a BDF font, read the same way lib/bdf-font.cc reads them
+    so that text rasterized from here lines up exactly with graphics.DrawText()
+    """
+    def __init__(self, path):
+        self.path = path
+        self.height = -1
+        self.baseline = 0
+        self.glyphs = {}
+        # (codepoint, colour) -> rows of RGB pixels, see glyph_rows()
+        self.rendered = {}
+
+        codepoint = None
+        device_width = 0
+        glyph = None
+        row = -1
+
+        with open(path, encoding="latin-1") as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+
+                keyword = parts[0]
+                if keyword == "FONTBOUNDINGBOX":
+                    self.height = int(parts[2])
+                    self.baseline = int(parts[4]) + self.height
+                elif keyword == "ENCODING":
+                    codepoint = int(parts[1])
+                elif keyword == "DWIDTH":
+                    device_width = min(int(parts[1]), MAX_GLYPH_WIDTH)
+                elif keyword == "BBX":
+                    glyph = Glyph(device_width, int(parts[2]), int(parts[4]))
+                    row = -1
+                elif keyword == "BITMAP":
+                    row = 0
+                elif keyword == "ENDCHAR":
+                    if glyph and row == glyph.height:
+                        self.glyphs[codepoint] = glyph
+                        glyph = None
+                elif glyph and 0 <= row < glyph.height:
+                    try:
+                        bits = int(keyword, 16) << (MAX_GLYPH_WIDTH - 4 * len(keyword))
+                    except ValueError:
+                        bits = 0
+                    glyph.bitmap.append(bits)
+                    row += 1
+
+    def find_glyph(self, codepoint):
+        glyph = self.glyphs.get(codepoint)
+        if glyph is None:
+            glyph = self.glyphs.get(UNICODE_REPLACEMENT_CODEPOINT)
+        return glyph
+
+    def glyph_rows(self, codepoint, colour_bytes):
+        """
+        The glyph as one row of RGB pixels (device_width wide) for each row of
+        the font, rasterized the first time it's asked for in each colour.
+        None if the font has no glyph for it
+        """
+        key = (codepoint, colour_bytes)
+        rows = self.rendered.get(key)
+        if rows is not None:
+            return rows
+
+        glyph = self.find_glyph(codepoint)
+        if glyph is None:
+            return None
+
+        blank = bytes(glyph.device_width * 3)
+        rows = [blank] * self.height
+        top = self.baseline - glyph.height - glyph.y_offset
+        for y, bits in enumerate(glyph.bitmap):
+            if bits == 0 or not 0 <= top + y < self.height:
+                continue
+
+            row = bytearray(blank)
+            for x in range(glyph.device_width):
+                if bits & (1 << (MAX_GLYPH_WIDTH - 1 - x)):
+                    row[x * 3:x * 3 + 3] = colour_bytes
+            rows[top + y] = bytes(row)
+
+        self.rendered[key] = rows
+        return rows
+
+    def preload(self, codepoints, colour):
+        """
+        Rasterize the glyphs ahead of time, so a new string made of them
+        doesn't have to in the middle of a frame
+        """
+        colour_bytes = bytes((colour.red, colour.green, colour.blue))
+        for codepoint in codepoints:
+            self.glyph_rows(codepoint, colour_bytes)
+
+    def text_width(self, text):
+        width = 0
+        for char in text:
+            glyph = self.find_glyph(ord(char))
+            if glyph:
+                width += glyph.device_width
+        return width
+
+
+class TextStrip(object):
+    """
+    A whole string rasterized once into a buffer of RGB pixels one font high.
+
+    Drawing it with SetPixelsBuffer() only walks the columns that are actually
+    on the canvas, so scrolling a long string costs the same as a short one.
+    """
+    def __init__(self, font, text, colour):
+        self.font = font
+        self.width = font.text_width(text)
+
+        colour_bytes = bytes((colour.red, colour.green, colour.blue))
+        glyphs = [font.glyph_rows(ord(char), colour_bytes) for char in text]
+        glyphs = [rows for rows in glyphs if rows is not None]
+
+        # Each row of the strip is just the same row of every glyph in turn
+        self.pixels = b"".join(b"".join(rows[y] for rows in glyphs) for y in range(font.height))
+
+    @property
+    def size(self):
+        return len(self.pixels)
+
+    def draw(self, canvas, x, y):
+        """
+        Draw the strip with its baseline at y, like graphics.DrawText(), and
+        return the width of the text
+        """
+        if self.width and x < canvas.width and x + self.width > 0:
+            canvas.SetPixelsBuffer(self.pixels, self.width, self.font.height, x, y - self.font.baseline)
+
+        return self.width
+
+
+class StripCache(object):
+    """
+    Least recently used cache of TextStrips keyed by (text, font, colour),
+    bounded by the total number of bytes held in the strips
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.strips = OrderedDict()
+
+    def get(self, font, text, colour):
+        key = (text, font, colour.red, colour.green, colour.blue)
+
+        strip = self.strips.get(key)
+        if strip is not None:
+            self.strips.move_to_end(key)
+            return strip
+
+        strip = TextStrip(font, text, colour)
+        self.strips[key] = strip
+        self.total_bytes += strip.size
+
+        # Always keep the newest strip, even if it's bigger than the budget
+        while self.total_bytes > self.max_bytes and len(self.strips) > 1:
+            _, evicted = self.strips.popitem(last=False)
+            self.total_bytes -= evicted.size
+
+        return strip
@@ -5,3 +5,4 @@ __version__ = "0.0.1"
 __author__ = "Christoph Friedrich <christoph.friedrich@vonaffenfels.de>"
 
 from .core import RGBMatrix, FrameCanvas, RGBMatrixOptions
+from .core import FileStreamIO, MemMapViewInput, StreamWriter, StreamReader
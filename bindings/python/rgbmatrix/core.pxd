@@ -1,8 +1,12 @@
 # cython: language_level=3str
+from libc.stdint cimport uint8_t
 from . cimport cppinc
 
 cdef class Canvas:
     cdef cppinc.Canvas *_getCanvas(self) except *
+    cdef _setPixelsBytes(self, int, int, int, int, bytes, int, bint, bytes, bint)
+    cdef _setPixelsFlat(self, int, int, int, int, const uint8_t *, int, bint, bytes, bint, clip=*)
+    cdef _setPixelRows(self, int, int, int, int, uint8_t **, int, bint, bytes, bint, clip=*)
 
 cdef class FrameCanvas(Canvas):
     cdef cppinc.FrameCanvas *__canvas
@@ -10,6 +14,18 @@ cdef class FrameCanvas(Canvas):
 cdef class RGBMatrix(Canvas):
     cdef cppinc.RGBMatrix *__matrix
 
+cdef class StreamIO:
+    cdef cppinc.StreamIO *_io
+    cdef cppinc.StreamIO *_getIO(self) except NULL
+
+cdef class StreamWriter:
+    cdef cppinc.StreamWriter *__writer
+    cdef StreamIO __stream_io
+
+cdef class StreamReader:
+    cdef cppinc.StreamReader *__reader
+    cdef StreamIO __stream_io
+
 cdef class RGBMatrixOptions:
     cdef cppinc.Options __options
     cdef cppinc.RuntimeOptions __runtime_options
@@ -2,55 +2,248 @@
 
 from libcpp cimport bool
 from libc.stdint cimport uint8_t, uint32_t, uintptr_t
+from libc.stdlib cimport malloc, free
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_C_CONTIGUOUS, PyBUF_WRITABLE
+from cpython.exc cimport PyErr_CheckSignals
+from posix.time cimport clock_gettime, timespec, CLOCK_MONOTONIC
+from posix.unistd cimport usleep
 import cython
+import os
+
+# Palette turning "L" and "1" images into opaque grey RGBA.
+_GREY_PALETTE = bytes(bytearray(v for i in range(256) for v in (i, i, i, 255)))
+
+# 256 RGBA entries for the pixel values of an "L", "1" or "P" image.
+cdef bytes _rgba_palette(image):
+    cdef object rgb, alpha, palette
+    if image.mode != "P":
+        return _GREY_PALETTE
+
+    rgb = bytes(bytearray(image.getpalette() or []))[:768].ljust(768, b"\0")
+    alpha = bytearray(b"\xff" * 256)
+    transparency = image.info.get("transparency")
+    if isinstance(transparency, int):
+        alpha[transparency] = 0
+    elif isinstance(transparency, bytes):
+        alpha[:len(transparency)] = transparency[:256]
+
+    palette = bytearray(1024)
+    palette[0::4] = rgb[0::3]
+    palette[1::4] = rgb[1::3]
+    palette[2::4] = rgb[2::3]
+    palette[3::4] = alpha
+    return bytes(palette)
+
+# Write a run of opaque pixels in one row. FrameCanvas can take the whole row
+# in one call, anything else gets them one by one.
+cdef inline void _set_pixel_run(cppinc.Canvas *canvas, cppinc.FrameCanvas *frame,
+                                int x, int y, int count,
+                                cppinc.Color *colors) noexcept nogil:
+    cdef int i
+    if count <= 0:
+        return
+    if frame != NULL:
+        frame.SetPixels(x, y, count, 1, colors)
+    else:
+        for i in range(count):
+            canvas.SetPixel(x + i, y, colors[i].r, colors[i].g, colors[i].b)
+
+# The native inner loop shared by all image modes. "rows" points to the start
+# of each image row, with bytes_per_pixel bytes per pixel that are either RGB
+# (followed by alpha, if has_alpha) or, if palette is not NULL, an index into
+# 256 RGBA palette entries. Rows are walked in order and pixels with an alpha of
+# 0 are skipped. Other pixels are drawn opaque, or with blend, darkened by their
+# alpha (i.e. blended on to black, as we can't read the canvas back).
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _set_pixel_rows(cppinc.Canvas *canvas, cppinc.FrameCanvas *frame,
+                          uint8_t **rows, int bytes_per_pixel, bint has_alpha,
+                          const uint8_t *palette, bint blend,
+                          int xstart, int ystart,
+                          int col_start, int col_end, int row_start, int row_end,
+                          cppinc.Color *run) noexcept nogil:
+    cdef int row, col, count
+    cdef const uint8_t *src
+    cdef const uint8_t *pixel
+    cdef uint8_t alpha
+
+    for row in range(row_start, row_end):
+        src = rows[row] + col_start * bytes_per_pixel
+        count = 0
+        for col in range(col_start, col_end):
+            pixel = palette + 4 * src[0] if palette != NULL else src
+            alpha = pixel[3] if has_alpha else 255
+            if alpha == 0:
+                _set_pixel_run(canvas, frame, xstart + col - count, ystart + row, count, run)
+                count = 0
+            elif blend and alpha != 255:
+                run[count].r = (pixel[0] * alpha + 127) // 255
+                run[count].g = (pixel[1] * alpha + 127) // 255
+                run[count].b = (pixel[2] * alpha + 127) // 255
+                count += 1
+            else:
+                run[count].r = pixel[0]
+                run[count].g = pixel[1]
+                run[count].b = pixel[2]
+                count += 1
+            src += bytes_per_pixel
+        _set_pixel_run(canvas, frame, xstart + col_end - count, ystart + row, count, run)
 
 cdef class Canvas:
     cdef cppinc.Canvas* _getCanvas(self) except *:
         raise Exception("Not implemented")
 
-    def SetImage(self, image, int offset_x = 0, int offset_y = 0, unsafe=True):
-        if (image.mode != "RGB"):
-            raise Exception("Currently, only RGB mode is supported for SetImage(). Please create images with mode 'RGB' or convert first with image = image.convert('RGB'). Pull requests to support more modes natively are also welcome :)")
-
-        if unsafe:
+    # Draw a PIL image with its top left corner at offset_x, offset_y.
+    # Images in mode "RGB", "RGBA", "L", "1" and "P" are drawn natively.
+    # Fully transparent pixels (alpha 0, or the transparent colour of a "P"
+    # image) are skipped; with blend=True partially transparent ones are
+    # darkened by their alpha, otherwise they are drawn opaque.
+    # Anything that isn't a PIL image is passed on to SetPixelsBuffer().
+    def SetImage(self, image, int offset_x = 0, int offset_y = 0, unsafe=True, blend=False):
+        if not hasattr(image, "mode"):
+            # Not a PIL image, so this should be something supporting the
+            # buffer protocol such as a NumPy uint8[height, width, 3] array.
+            self.SetPixelsBuffer(image, offset_x=offset_x, offset_y=offset_y)
+            return
+
+        if image.mode not in ("RGB", "RGBA", "L", "1", "P"):
+            raise Exception("Currently, only RGB, RGBA, L, 1 and P modes are supported for SetImage(). Please convert first with e.g. image = image.convert('RGB'). Pull requests to support more modes natively are also welcome :)")
+
+        img_width, img_height = image.size
+        image.load()
+        if unsafe and hasattr(image.im, "unsafe_ptrs"):
             #In unsafe mode we directly access the underlying PIL image array
             #in cython, which is considered unsafe pointer accecss,
             #however it's super fast and seems to work fine
             #https://groups.google.com/forum/#!topic/cython-users/Dc1ft5W6KM4
-            img_width, img_height = image.size
-            self.SetPixelsPillow(offset_x, offset_y, img_width, img_height, image)
+            #(Newer Pillow versions don't offer this anymore, so they always
+            #take the safe path below.)
+            self.SetPixelsPillow(offset_x, offset_y, img_width, img_height, image, blend)
         else:
-            # First implementation of a SetImage(). OPTIMIZE_ME: A more native
-            # implementation that directly reads the buffer and calls the underlying
-            # C functions can certainly be faster.
-            img_width, img_height = image.size
-            pixels = image.load()
-            for x in range(max(0, -offset_x), min(img_width, self.width - offset_x)):
-                for y in range(max(0, -offset_y), min(img_height, self.height - offset_y)):
-                    (r, g, b) = pixels[x, y]
-                    self.SetPixel(x + offset_x, y + offset_y, r, g, b)
+            # Copy the pixels out of the image first, then draw them with the
+            # same native loop.
+            if image.mode == "1":
+                image = image.convert("L")
+            if image.mode in ("L", "P"):
+                self._setPixelsBytes(offset_x, offset_y, img_width, img_height,
+                                     image.tobytes(), 1, True, _rgba_palette(image), blend)
+            else:
+                self._setPixelsBytes(offset_x, offset_y, img_width, img_height,
+                                     image.tobytes(), len(image.mode), image.mode == "RGBA",
+                                     None, blend)
 
     @cython.boundscheck(False)
     @cython.wraparound(False)
-    def SetPixelsPillow(self, int xstart, int ystart, int width, int height, image):
-        cdef cppinc.FrameCanvas* my_canvas = <cppinc.FrameCanvas*>self._getCanvas()
-        cdef int frame_width = my_canvas.width()
-        cdef int frame_height = my_canvas.height()
-        cdef int row, col
-        cdef uint8_t r, g, b
-        cdef uint32_t **image_ptr
-        cdef uint32_t pixel
-        image.load()
-        ptr_tmp = dict(image.im.unsafe_ptrs)['image32']
-        image_ptr = (<uint32_t **>(<uintptr_t>ptr_tmp))
+    def SetPixelsPillow(self, int xstart, int ystart, int width, int height, image, blend=False):
+        if image.mode not in ("RGB", "RGBA", "L", "1", "P"):
+            raise Exception("SetPixelsPillow() does not support images in mode '%s'" % image.mode)
 
-        for col in range(max(0, -xstart), min(width, frame_width - xstart)):
-            for row in range(max(0, -ystart), min(height, frame_height - ystart)):
-                pixel = image_ptr[row][col]
-                r = (pixel ) & 0xFF
-                g = (pixel >> 8) & 0xFF
-                b = (pixel >> 16) & 0xFF
-                my_canvas.SetPixel(xstart+col, ystart+row, r, g, b)
+        image.load()
+        ptr_tmp = dict(image.im.unsafe_ptrs)['image']
+        # 8 bit modes have one byte per pixel, all the others are 32 bit RGBX/RGBA
+        if image.mode in ("L", "1", "P"):
+            self._setPixelRows(xstart, ystart, width, height,
+                               <uint8_t **>(<uintptr_t>ptr_tmp), 1, True, _rgba_palette(image), blend)
+        else:
+            self._setPixelRows(xstart, ystart, width, height,
+                               <uint8_t **>(<uintptr_t>ptr_tmp), 4, image.mode == "RGBA", None, blend)
+
+    cdef _setPixelsBytes(self, int xstart, int ystart, int width, int height,
+                         bytes data, int bytes_per_pixel, bint has_alpha,
+                         bytes palette, bint blend):
+        self._setPixelsFlat(xstart, ystart, width, height, <const uint8_t *>data,
+                            bytes_per_pixel, has_alpha, palette, blend)
+
+    # Draw pixels stored row after row from data, through _setPixelRows().
+    cdef _setPixelsFlat(self, int xstart, int ystart, int width, int height,
+                        const uint8_t *data, int bytes_per_pixel, bint has_alpha,
+                        bytes palette, bint blend, clip = None):
+        cdef int row
+        cdef uint8_t **rows = <uint8_t **>malloc(max(height, 1) * sizeof(uint8_t *))
+        if rows == NULL:
+            raise MemoryError()
+        try:
+            for row in range(height):
+                rows[row] = <uint8_t *>data + <Py_ssize_t>row * width * bytes_per_pixel
+            self._setPixelRows(xstart, ystart, width, height, rows, bytes_per_pixel,
+                               has_alpha, palette, blend, clip)
+        finally:
+            free(rows)
+
+    # The one native row writer behind SetImage(), SetPixelsPillow() and
+    # SetPixelsBuffer(). Only the part of the image landing on the canvas and
+    # inside the optional clip=(x, y, width, height) rectangle (in canvas
+    # coordinates) is drawn.
+    cdef _setPixelRows(self, int xstart, int ystart, int width, int height,
+                       uint8_t **rows, int bytes_per_pixel, bint has_alpha,
+                       bytes palette, bint blend, clip = None):
+        cdef cppinc.Canvas* my_canvas = self._getCanvas()
+        cdef cppinc.FrameCanvas* my_frame = NULL
+        cdef const uint8_t *palette_ptr = NULL
+        cdef cppinc.Color *run
+        cdef int clip_x = 0, clip_y = 0
+        cdef int clip_width = my_canvas.width(), clip_height = my_canvas.height()
+        cdef int col_start, col_end, row_start, row_end
+
+        if clip is not None:
+            clip_x, clip_y, clip_width, clip_height = clip
+
+        # Clip once to the canvas and the clip rectangle, in image coordinates
+        col_start = max(0, -xstart, clip_x - xstart)
+        col_end = min(width, my_canvas.width() - xstart, clip_x + clip_width - xstart)
+        row_start = max(0, -ystart, clip_y - ystart)
+        row_end = min(height, my_canvas.height() - ystart, clip_y + clip_height - ystart)
+
+        if col_end <= col_start or row_end <= row_start:
+            return
+
+        if isinstance(self, FrameCanvas):
+            my_frame = <cppinc.FrameCanvas*>my_canvas
+        if palette is not None:
+            palette_ptr = <const uint8_t *>palette
+
+        run = <cppinc.Color *>malloc((col_end - col_start) * sizeof(cppinc.Color))
+        if run == NULL:
+            raise MemoryError()
+        try:
+            with nogil:
+                _set_pixel_rows(my_canvas, my_frame, rows, bytes_per_pixel, has_alpha,
+                                palette_ptr, blend, xstart, ystart,
+                                col_start, col_end, row_start, row_end, run)
+        finally:
+            free(run)
+
+    # Copy RGB pixels from any C-contiguous buffer of bytes (e.g. a NumPy
+    # uint8[height, width, 3] array, bytes, bytearray or memoryview) to the
+    # canvas, with the top left pixel at offset_x, offset_y.
+    # For 3-dimensional buffers the size is taken from their shape, flat
+    # buffers need width and height to be given.
+    # Only the part of the buffer landing inside the optional
+    # clip=(x, y, width, height) rectangle (in canvas coordinates) is copied.
+    # Each row is copied in runs, through the same native row writer as
+    # SetImage().
+    def SetPixelsBuffer(self, data, int width = -1, int height = -1,
+                        int offset_x = 0, int offset_y = 0, clip = None):
+        cdef Py_buffer view
+
+        PyObject_GetBuffer(data, &view, PyBUF_C_CONTIGUOUS)
+        try:
+            if view.itemsize != 1:
+                raise ValueError("SetPixelsBuffer() needs a buffer of uint8, got items of %d bytes" % view.itemsize)
+            if view.ndim == 3:
+                if view.shape[2] != 3:
+                    raise ValueError("SetPixelsBuffer() needs 3 bytes (RGB) per pixel, got %d" % view.shape[2])
+                height = view.shape[0]
+                width = view.shape[1]
+            elif width < 0 or height < 0:
+                raise ValueError("width and height are needed for a flat buffer")
+            if view.len < <Py_ssize_t>width * height * 3:
+                raise ValueError("Buffer of %d bytes is too small for %dx%d RGB pixels" % (view.len, width, height))
+
+            self._setPixelsFlat(offset_x, offset_y, width, height, <const uint8_t *>view.buf,
+                                3, False, None, False, clip)
+        finally:
+            PyBuffer_Release(&view)
 
 cdef class FrameCanvas(Canvas):
     def __dealloc__(self):
@@ -71,6 +264,48 @@ cdef class FrameCanvas(Canvas):
     def SetPixel(self, int x, int y, uint8_t red, uint8_t green, uint8_t blue):
         (<cppinc.FrameCanvas*>self._getCanvas()).SetPixel(x, y, red, green, blue)
 
+    # Copy the whole content of another FrameCanvas created by the same
+    # RGBMatrix into this one. This is a plain memory copy, so it is a very
+    # cheap way to start a frame from a pre-rendered background.
+    def CopyFrom(self, FrameCanvas other):
+        (<cppinc.FrameCanvas*>self._getCanvas()).CopyFrom(
+            (<cppinc.FrameCanvas*>other._getCanvas())[0])
+
+    # The (red, green, blue) of the pixel at x, y, read back from the frame.
+    # The frame only holds colors as mapped for the panels (by pwmBits,
+    # brightness and luminance correction), so they are mapped back: at full
+    # brightness a few very dark colors come back one off, otherwise they are
+    # exactly what was drawn. Pixels outside the canvas are black.
+    def GetPixel(self, int x, int y):
+        cdef uint8_t red, green, blue
+        (<cppinc.FrameCanvas*>self._getCanvas()).GetPixel(x, y, &red, &green, &blue)
+        return (red, green, blue)
+
+    # The whole canvas read back as uint8[height, width, 3] RGB, after pixel
+    # mapping, in one native call. The frame is stored as bitplanes, so there
+    # is no RGB buffer to share and this is always a copy: into a new buffer
+    # returned as a memoryview (numpy.asarray() wraps it without copying
+    # again), or into the writable C-contiguous buffer out, e.g. a NumPy
+    # array reused for every frame, which is returned.
+    def GetPixels(self, out = None):
+        cdef cppinc.FrameCanvas *frame = <cppinc.FrameCanvas*>self._getCanvas()
+        cdef int width = frame.width(), height = frame.height()
+        cdef Py_ssize_t size = <Py_ssize_t>width * height * 3
+        cdef Py_buffer view
+
+        if out is None:
+            out = memoryview(bytearray(size)).cast("B", (height, width, 3))
+        PyObject_GetBuffer(out, &view, PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS)
+        try:
+            if view.itemsize != 1:
+                raise ValueError("GetPixels() needs a buffer of uint8, got items of %d bytes" % view.itemsize)
+            if view.len < size:
+                raise ValueError("Buffer of %d bytes is too small for %dx%d RGB pixels" % (view.len, width, height))
+            with nogil:
+                frame.GetPixels(<uint8_t *>view.buf)
+        finally:
+            PyBuffer_Release(&view)
+        return out
 
     property width:
         def __get__(self): return (<cppinc.FrameCanvas*>self._getCanvas()).width()
@@ -192,6 +427,10 @@ cdef class RGBMatrixOptions:
         def __get__(self): return self.__runtime_options.drop_privileges
         def __set__(self, uint8_t value): self.__runtime_options.drop_privileges = value
 
+    property do_gpio_init:
+        def __get__(self): return self.__runtime_options.do_gpio_init
+        def __set__(self, value): self.__runtime_options.do_gpio_init = value
+
     property drop_priv_user:
         def __get__(self): return self.__runtime_options.drop_priv_user
         def __set__(self, value):
@@ -278,6 +517,123 @@ cdef __createFrameCanvas(cppinc.FrameCanvas* newCanvas):
     canvas.__canvas = newCanvas
     return canvas
 
+# Content streams (see include/content-streamer.h): FrameCanvas contents in
+# their internal representation, so they can be replayed with next to no CPU.
+
+cdef class StreamIO:
+    def __dealloc__(self):
+        if <void*>self._io != NULL:
+            del self._io
+            self._io = NULL
+
+    cdef cppinc.StreamIO* _getIO(self) except NULL:
+        if <void*>self._io != NULL:
+            return self._io
+        raise Exception("Use FileStreamIO or MemMapViewInput, StreamIO itself can't be used directly")
+
+    def Rewind(self):
+        self._getIO().Rewind()
+
+# A stream in a file, opened for reading (mode "r") or for writing (mode "w",
+# which truncates the file first).
+cdef class FileStreamIO(StreamIO):
+    def __cinit__(self, filename, mode = "r"):
+        if mode == "r":
+            fd = os.open(filename, os.O_RDONLY)
+        elif mode == "w":
+            fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        else:
+            raise ValueError("mode must be 'r' or 'w', not %r" % mode)
+        # Takes ownership of the file descriptor
+        self._io = new cppinc.FileStreamIO(fd)
+
+# A read-only stream of a memory mapped file. Reading frames from this is
+# just a memory copy, so there is no IO latency while playing.
+cdef class MemMapViewInput(StreamIO):
+    def __cinit__(self, filename):
+        cdef cppinc.MemMapViewInput *io
+        fd = os.open(filename, os.O_RDONLY)
+        # Takes ownership of the file descriptor
+        io = new cppinc.MemMapViewInput(fd)
+        if not io.IsInitialized():
+            del io
+            raise IOError("Couldn't mmap() " + filename)
+        self._io = io
+
+cdef class StreamWriter:
+    def __cinit__(self, StreamIO io):
+        self.__stream_io = io
+        self.__writer = new cppinc.StreamWriter(io._getIO())
+
+    def __dealloc__(self):
+        if <void*>self.__writer != NULL:
+            del self.__writer
+            self.__writer = NULL
+
+    # Append the content of the canvas, to be shown for hold_time_us
+    # microseconds. All frames of a stream need the same matrix settings.
+    def Stream(self, FrameCanvas canvas, uint32_t hold_time_us):
+        return self.__writer.Stream((<cppinc.FrameCanvas*>canvas._getCanvas())[0], hold_time_us)
+
+cdef class StreamReader:
+    def __cinit__(self, StreamIO io):
+        self.__stream_io = io
+        self.__reader = new cppinc.StreamReader(io._getIO())
+
+    def __dealloc__(self):
+        if <void*>self.__reader != NULL:
+            del self.__reader
+            self.__reader = NULL
+
+    def Rewind(self):
+        self.__reader.Rewind()
+
+    # Load the next frame into the canvas and return its hold time in
+    # microseconds, or None at the end of the stream (or on error).
+    def GetNext(self, FrameCanvas canvas):
+        cdef uint32_t hold_time_us = 0
+        if not self.__reader.GetNext(<cppinc.FrameCanvas*>canvas._getCanvas(), &hold_time_us):
+            return None
+        return hold_time_us
+
+    # Play the stream from the start on the matrix "loops" times (forever if
+    # negative), honouring the hold time of each frame. "canvas" is used as
+    # the off-screen canvas. This all happens in C++ without the GIL, so there is
+    # no Python work per frame; CTRL-C is only noticed at the end of a loop.
+    # Returns the canvas that is now free for drawing.
+    def Play(self, RGBMatrix matrix, FrameCanvas canvas, int loops = 1,
+             uint8_t framerate_fraction = 1):
+        cdef cppinc.RGBMatrix *my_matrix = <cppinc.RGBMatrix*>matrix._getCanvas()
+        cdef cppinc.FrameCanvas *frame = <cppinc.FrameCanvas*>canvas._getCanvas()
+        cdef cppinc.FrameCanvas *previous
+        cdef uint32_t hold_time_us
+        cdef long spent_us
+        cdef int loop = 0, frames
+        cdef timespec start, end
+
+        self.__reader.Rewind()
+        while loops < 0 or loop < loops:
+            with nogil:
+                frames = 0
+                while self.__reader.GetNext(frame, &hold_time_us):
+                    clock_gettime(CLOCK_MONOTONIC, &start)
+                    previous = my_matrix.SwapOnVSync(frame, framerate_fraction)
+                    if previous != NULL:
+                        frame = previous
+                    clock_gettime(CLOCK_MONOTONIC, &end)
+                    spent_us = ((end.tv_sec - start.tv_sec) * 1000000
+                                + (end.tv_nsec - start.tv_nsec) // 1000)
+                    if hold_time_us > spent_us:
+                        usleep(hold_time_us - spent_us)
+                    frames += 1
+                self.__reader.Rewind()
+            PyErr_CheckSignals()
+            if frames == 0:
+                break  # Empty or unreadable stream
+            loop += 1
+
+        return __createFrameCanvas(frame)
+
 # Local Variables:
 # mode: python
 # End:
@@ -22,19 +22,24 @@ cdef extern from "led-matrix.h" namespace "rgb_matrix":
         void SetBrightness(uint8_t)
         uint8_t brightness()
         FrameCanvas *CreateFrameCanvas()
-        FrameCanvas *SwapOnVSync(FrameCanvas*, uint8_t)
+        FrameCanvas *SwapOnVSync(FrameCanvas*, uint8_t) nogil
 
     cdef cppclass FrameCanvas(Canvas):
         bool SetPWMBits(uint8_t)
         uint8_t pwmbits()
         void SetBrightness(uint8_t)
         uint8_t brightness()
+        void CopyFrom(FrameCanvas&) nogil
+        void SetPixels(int, int, int, int, Color*) nogil
+        void GetPixel(int, int, uint8_t*, uint8_t*, uint8_t*)
+        void GetPixels(uint8_t*) nogil
 
     struct RuntimeOptions:
       RuntimeOptions() except +
       int gpio_slowdown
       int daemon
       int drop_privileges
+      bool do_gpio_init
       const char *drop_priv_user
       const char *drop_priv_group
 
@@ -82,9 +87,29 @@ cdef extern from "graphics.h" namespace "rgb_matrix":
         bool LoadFont(const char*)
         int height()
         int baseline()
-        int CharacterWidth(uint32_t)
-        int DrawGlyph(Canvas*, int, int, const Color, uint32_t);
+        int CharacterWidth(uint32_t) nogil
+        int DrawGlyph(Canvas*, int, int, const Color, uint32_t) nogil
 
-    cdef int DrawText(Canvas*, const Font, int, int, const Color, const char*)
-    cdef void DrawCircle(Canvas*, int, int, int, const Color)
-    cdef void DrawLine(Canvas*, int, int, int, int, const Color)
+    cdef int DrawText(Canvas*, const Font, int, int, const Color, const char*) nogil
+    cdef void DrawCircle(Canvas*, int, int, int, const Color) nogil
+    cdef void DrawLine(Canvas*, int, int, int, int, const Color) nogil
+
+cdef extern from "content-streamer.h" namespace "rgb_matrix":
+    cdef cppclass StreamIO:
+        void Rewind() nogil
+
+    cdef cppclass FileStreamIO(StreamIO):
+        FileStreamIO(int)
+
+    cdef cppclass MemMapViewInput(StreamIO):
+        MemMapViewInput(int)
+        bool IsInitialized()
+
+    cdef cppclass StreamWriter:
+        StreamWriter(StreamIO*)
+        bool Stream(const FrameCanvas&, uint32_t) nogil
+
+    cdef cppclass StreamReader:
+        StreamReader(StreamIO*)
+        void Rewind() nogil
+        bool GetNext(FrameCanvas*, uint32_t*) nogil
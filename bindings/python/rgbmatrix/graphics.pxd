@@ -1,4 +1,6 @@
 # cython: language_level=3str
+from libc.stdint cimport uint32_t
+from libcpp.vector cimport vector
 from . cimport cppinc
 
 cdef class Color:
@@ -7,6 +9,26 @@ cdef class Color:
 cdef class Font:
     cdef cppinc.Font __font
 
+cdef class TextRun:
+    cdef Font _font
+    cdef str _text
+    cdef vector[uint32_t] _codepoints
+    # Where each glyph ends, in pixels from the start of the run
+    cdef vector[int] _ends
+
+cdef struct DrawCommand:
+    int kind
+    int x0, y0, x1, y1
+    cppinc.Color color
+    const cppinc.Font *font
+    const char *text
+
+cdef class DrawList:
+    cdef vector[DrawCommand] _commands
+    # The fonts and encoded texts the commands point into, kept alive here
+    cdef list _refs
+    cdef _add(self, int, int, int, int, int, Color)
+
 # Local Variables:
 # mode: python
 # End:
@@ -2,6 +2,9 @@
 
 from libcpp cimport bool
 from libc.stdint cimport uint8_t, uint32_t
+import cython
+
+cdef uint32_t _REPLACEMENT_CHARACTER = 0xFFFD
 
 from . cimport core
 
@@ -23,6 +26,14 @@ cdef class Color:
         def __get__(self): return self.__color.b
         def __set__(self, uint8_t value): self.__color.b = value
 
+# How far a glyph advances, the same way Font::DrawGlyph() falls back to the
+# replacement character (or nothing at all) for characters not in the font.
+cdef inline int _advance(cppinc.Font *font, uint32_t char) noexcept nogil:
+    cdef int width = font.CharacterWidth(char)
+    if width < 0:
+        width = font.CharacterWidth(_REPLACEMENT_CHARACTER)
+    return width if width > 0 else 0
+
 cdef class Font:
     def CharacterWidth(self, uint32_t char):
         return self.__font.CharacterWidth(char)
@@ -34,6 +45,13 @@ cdef class Font:
     def DrawGlyph(self, core.Canvas c, int x, int y, Color color, uint32_t char):
         return self.__font.DrawGlyph(c._getCanvas(), x, y, color.__color, char)
 
+    # The width DrawText() would advance by for the text, without drawing it
+    def Measure(self, text):
+        cdef int width = 0
+        for char in text:
+            width += _advance(&self.__font, ord(char))
+        return width
+
     property height:
         def __get__(self): return self.__font.height()
 
@@ -49,6 +67,158 @@ def DrawCircle(core.Canvas c, int x, int y, int r, Color color):
 def DrawLine(core.Canvas c, int x1, int y1, int x2, int y2, Color color):
     cppinc.DrawLine(c._getCanvas(), x1, y1, x2, y2, color.__color)
 
+cdef inline cppinc.Color _get_color(Color color):
+    return color.__color
+
+cdef inline cppinc.Font *_get_font(Font font):
+    return &font.__font
+
+# A text prepared for drawing with one font: the characters and their advances
+# are looked up once, so the width is known before drawing it, and drawing
+# skips the glyphs that are entirely off the canvas to the left or right.
+# Measurements are taken when it's created, so make a new one after loading
+# a different font into the Font.
+cdef class TextRun:
+    def __cinit__(self, Font f, text):
+        cdef cppinc.Font *font = _get_font(f)
+        cdef int x = 0
+        self._font = f
+        self._text = text
+        for char in text:
+            self._codepoints.push_back(ord(char))
+            x += _advance(font, self._codepoints.back())
+            self._ends.push_back(x)
+
+    property text:
+        def __get__(self): return self._text
+
+    property width:
+        def __get__(self): return self._ends.back() if not self._ends.empty() else 0
+
+    def __len__(self):
+        return self._codepoints.size()
+
+    # Draw with the baseline at y, like DrawText(), returning the width
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def Draw(self, core.Canvas c, int x, int y, Color color):
+        cdef cppinc.Canvas *canvas = c._getCanvas()
+        cdef cppinc.Font *font = _get_font(self._font)
+        cdef cppinc.Color native_color = _get_color(color)
+        cdef int canvas_width = canvas.width()
+        cdef int count = self._codepoints.size()
+        cdef const int *ends = self._ends.data()
+        cdef const uint32_t *codepoints = self._codepoints.data()
+        cdef int low = 0, high = count, middle, start
+
+        if count == 0:
+            return 0
+        with nogil:
+            # The first glyph that ends on the canvas
+            while low < high:
+                middle = (low + high) // 2
+                if x + ends[middle] < 0:
+                    low = middle + 1
+                else:
+                    high = middle
+            start = ends[low - 1] if low > 0 else 0
+            while low < count and x + start <= canvas_width:
+                font.DrawGlyph(canvas, x + start, y, native_color, codepoints[low])
+                start = ends[low]
+                low += 1
+        return ends[count - 1]
+
+cdef enum:
+    _DRAW_PIXEL
+    _DRAW_LINE
+    _DRAW_RECT
+    _DRAW_CIRCLE
+    _DRAW_TEXT
+
+# Run the commands one after the other. A rect is filled, and clipped to the
+# canvas first so its loop only visits pixels that are really there.
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _draw_commands(cppinc.Canvas *canvas, int width, int height,
+                         const DrawCommand *commands, size_t count) noexcept nogil:
+    cdef size_t i
+    cdef int x, y, x_end, y_end
+    cdef const DrawCommand *cmd
+
+    for i in range(count):
+        cmd = &commands[i]
+        if cmd.kind == _DRAW_PIXEL:
+            canvas.SetPixel(cmd.x0, cmd.y0, cmd.color.r, cmd.color.g, cmd.color.b)
+        elif cmd.kind == _DRAW_LINE:
+            cppinc.DrawLine(canvas, cmd.x0, cmd.y0, cmd.x1, cmd.y1, cmd.color)
+        elif cmd.kind == _DRAW_RECT:
+            x_end = min(cmd.x0 + cmd.x1, width)
+            y_end = min(cmd.y0 + cmd.y1, height)
+            for y in range(max(cmd.y0, 0), y_end):
+                for x in range(max(cmd.x0, 0), x_end):
+                    canvas.SetPixel(x, y, cmd.color.r, cmd.color.g, cmd.color.b)
+        elif cmd.kind == _DRAW_CIRCLE:
+            cppinc.DrawCircle(canvas, cmd.x0, cmd.y0, cmd.x1, cmd.color)
+        elif cmd.kind == _DRAW_TEXT:
+            cppinc.DrawText(canvas, cmd.font[0], cmd.x0, cmd.y0, cmd.color, cmd.text)
+
+# A list of drawing commands that are all drawn in one call, without the GIL.
+# Build it once (e.g. for the parts of a screen that don't change) and Draw()
+# it every frame, or Clear() and refill it as things change. Colors are copied
+# when a command is added, fonts and texts are referenced.
+cdef class DrawList:
+    def __cinit__(self):
+        self._refs = []
+
+    def __len__(self):
+        return self._commands.size()
+
+    cdef _add(self, int kind, int x0, int y0, int x1, int y1, Color color):
+        cdef DrawCommand cmd
+        cmd.kind = kind
+        cmd.x0 = x0
+        cmd.y0 = y0
+        cmd.x1 = x1
+        cmd.y1 = y1
+        cmd.color = _get_color(color)
+        cmd.font = NULL
+        cmd.text = NULL
+        self._commands.push_back(cmd)
+
+    def Pixel(self, int x, int y, Color color):
+        self._add(_DRAW_PIXEL, x, y, 0, 0, color)
+
+    def Line(self, int x1, int y1, int x2, int y2, Color color):
+        self._add(_DRAW_LINE, x1, y1, x2, y2, color)
+
+    # A filled rectangle, width x height pixels from x, y
+    def Rect(self, int x, int y, int width, int height, Color color):
+        self._add(_DRAW_RECT, x, y, width, height, color)
+
+    def Circle(self, int x, int y, int r, Color color):
+        self._add(_DRAW_CIRCLE, x, y, r, 0, color)
+
+    # Text with its baseline at y, like DrawText()
+    def Text(self, Font f, int x, int y, Color color, text):
+        cdef bytes encoded = text.encode('utf-8')
+        self._add(_DRAW_TEXT, x, y, 0, 0, color)
+        self._commands.back().font = _get_font(f)
+        self._commands.back().text = encoded
+        self._refs.append(f)
+        self._refs.append(encoded)
+
+    def Clear(self):
+        self._commands.clear()
+        self._refs = []
+
+    def Draw(self, core.Canvas c):
+        cdef cppinc.Canvas *canvas = c._getCanvas()
+        cdef int width = canvas.width(), height = canvas.height()
+        if self._commands.empty():
+            return
+        with nogil:
+            _draw_commands(canvas, width, height, self._commands.data(), self._commands.size())
+
 # Local Variables:
 # mode: python
 # End:
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# Measures how many pixels per second SetImage() pushes into a FrameCanvas
+# for the different image modes, on canvases the same size as the image.
+#
+# Only the framebuffer in memory is used, the GPIO is never touched, so
+# this runs without root (and even on a machine that isn't a Raspberry Pi).
+import time
+import sys
+
+from rgbmatrix import RGBMatrix, RGBMatrixOptions
+from PIL import Image
+
+# (width, height) of the images, and the panel layout giving a canvas that size
+SIZES = [
+    ((64, 32), dict(rows=32, cols=64, chain_length=1, parallel=1)),
+    ((192, 128), dict(rows=64, cols=64, chain_length=3, parallel=2)),
+]
+MODES = ["RGB", "RGBA", "L", "P"]
+
+seconds_per_test = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+
+
+def make_image(width, height, mode):
+    # A gradient with a transparent stripe, so alpha handling gets exercised
+    image = Image.new("RGBA", (width, height))
+    for y in range(height):
+        for x in range(width):
+            alpha = 0 if x % 16 == 0 else 255
+            image.putpixel((x, y), (x * 255 // width, y * 255 // height, 128, alpha))
+    if mode == "P":
+        return image.convert("RGB").quantize(256)
+    return image.convert(mode)
+
+
+for (width, height), layout in SIZES:
+    options = RGBMatrixOptions()
+    options.hardware_mapping = 'regular'
+    options.do_gpio_init = False
+    options.drop_privileges = False
+    for key, value in layout.items():
+        setattr(options, key, value)
+
+    matrix = RGBMatrix(options = options)
+    canvas = matrix.CreateFrameCanvas()
+
+    for mode in MODES:
+        image = make_image(width, height, mode)
+        for unsafe in (True, False):
+            frames = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds_per_test:
+                canvas.SetImage(image, unsafe=unsafe)
+                frames += 1
+            elapsed = time.perf_counter() - start
+
+            print("%3dx%-3d %-4s %-6s %8.2f Megapixels/s" % (
+                width, height, mode, "unsafe" if unsafe else "safe",
+                frames * width * height / elapsed / 1e6))
@@ -377,6 +377,22 @@ public:
   // Copy content from other FrameCanvas owned by the same RGBMatrix.
   void CopyFrom(const FrameCanvas &other);
 
+  //-- GetPixel()/GetPixels() read back what has been drawn.
+
+  // The color of the pixel at x, y, as it would have been given to
+  // SetPixel() with the current pwm bits, brightness and luminance
+  // correction. The frame only keeps the colors as mapped for the panel, so
+  // they are mapped back; a few very dark colors can come back one off, and
+  // fewer pwm bits or a lower brightness lose more. Pixels outside the canvas
+  // read as black.
+  void GetPixel(int x, int y,
+                uint8_t *red, uint8_t *green, uint8_t *blue) const;
+
+  // The same for the whole canvas at once, into "rgb", which needs
+  // width() * height() * 3 bytes: rows from the top, left to right, three
+  // bytes (red, green, blue) per pixel.
+  void GetPixels(uint8_t *rgb) const;
+
   // -- Canvas interface.
   virtual int width() const;
   virtual int height() const;
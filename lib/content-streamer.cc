@@ -77,7 +77,8 @@ ssize_t MemStreamIO::Append(const void *buf, size_t count) {
   return count;
 }
 
-MemMapViewInput::MemMapViewInput(int fd) : buffer_(nullptr) {
+MemMapViewInput::MemMapViewInput(int fd)
+  : buffer_(nullptr), end_(nullptr), pos_(nullptr) {
   struct stat s;
   if (fstat(fd, &s) < 0) {
     close(fd);
@@ -90,9 +91,11 @@ MemMapViewInput::MemMapViewInput(int fd) : buffer_(nullptr) {
   close(fd);
   if (buffer_ == MAP_FAILED) {
     perror("Can't mmmap()");
+    buffer_ = nullptr;  // Stay uninitialized, see IsInitialized()
     return;
   }
   end_ = buffer_ + file_size;
+  pos_ = buffer_;
 #ifdef POSIX_MADV_WILLNEED
   // Trigger read-ahead if possible.
   posix_madvise(buffer_, file_size, POSIX_MADV_WILLNEED);
@@ -101,7 +104,7 @@ MemMapViewInput::MemMapViewInput(int fd) : buffer_(nullptr) {
 
 void MemMapViewInput::Rewind() { pos_ = buffer_; }
 ssize_t MemMapViewInput::Read(void *buf, size_t count) {
-  if (pos_ + count >= end_) return -1;
+  if (pos_ + count > end_) return -1;
   memcpy(buf, pos_, count);
   pos_ += count;
   return count;
@@ -149,8 +152,7 @@ bool StreamWriter::Stream(const FrameCanvas &frame, uint32_t hold_time_us) {
   h.magic = kFrameMagicValue;
   h.size = len;
   h.hold_time_us = hold_time_us;
-  FullAppend(io_, &h, sizeof(h));
-  return FullAppend(io_, data, len) == (ssize_t)len;
+  return FullAppend(io_, &h, sizeof(h)) && FullAppend(io_, data, len);
 }
 
 void StreamWriter::WriteFileHeader(const FrameCanvas &frame, size_t len) {
@@ -131,6 +131,15 @@ public:
   void Clear();
   void Fill(uint8_t red, uint8_t green, uint8_t blue);
 
+  // Read back the color of a pixel, the way SetPixel() would have set it with
+  // the current pwm bits, brightness and luminance correction. Colors are
+  // only stored in the bitplanes, so this maps them back, which loses nothing
+  // at full brightness except for the few colors that map to the same value.
+  // Pixels outside the canvas are black.
+  void GetPixel(int x, int y, uint8_t *red, uint8_t *green, uint8_t *blue) const;
+  // The same for all of them, into width() * height() * 3 bytes of RGB.
+  void GetPixels(uint8_t *rgb) const;
+
 private:
   static const struct HardwareMapping *hardware_mapping_;
   static RowAddressSetter *row_setter_;
@@ -146,6 +155,11 @@ private:
                              PixelDesignator *designator);
   inline void  MapColors(uint8_t r, uint8_t g, uint8_t b,
                          uint16_t *red, uint16_t *green, uint16_t *blue);
+  inline uint16_t MapColor(uint8_t c) const;
+  inline uint16_t UsedBitsMask() const;
+  uint8_t UnmapColor(uint16_t value) const;
+  void ReadPixel(const PixelDesignator *designator,
+                 uint16_t *red, uint16_t *green, uint16_t *blue) const;
   const int rows_;     // Number of rows. 16 or 32.
   const int parallel_; // Parallel rows of chains. 1 or 2.
   const int height_;   // rows * parallel
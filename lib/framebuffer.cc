@@ -702,6 +702,87 @@ void Framebuffer::SetPixels(int x, int y, int width, int height, Color *colors)
     }
   }
 }
+// One color channel, as MapColors() does it but without the inversion.
+inline uint16_t Framebuffer::MapColor(uint8_t c) const {
+  return do_luminance_correct_
+    ? CIEMapColor(brightness_, c)
+    : DirectMapColor(brightness_, c);
+}
+
+// The bits of a mapped color that are kept in the bitplanes.
+inline uint16_t Framebuffer::UsedBitsMask() const {
+  return ((1 << kBitPlanes) - 1) & ~((1 << (kBitPlanes - pwm_bits_)) - 1);
+}
+
+// The smallest color that maps to at least the given value. Mapping colors
+// is monotonic, so this is the color that was set, unless more than one
+// maps to the same value.
+uint8_t Framebuffer::UnmapColor(uint16_t value) const {
+  const uint16_t used = UsedBitsMask();
+  int low = 0, high = 255;
+  while (low < high) {
+    const int middle = (low + high) / 2;
+    if ((MapColor(middle) & used) < value)
+      low = middle + 1;
+    else
+      high = middle;
+  }
+  return low;
+}
+
+void Framebuffer::ReadPixel(const PixelDesignator *designator,
+                            uint16_t *red, uint16_t *green,
+                            uint16_t *blue) const {
+  *red = *green = *blue = 0;
+  if (designator == NULL || designator->gpio_word < 0) return;
+
+  const gpio_bits_t *bits = bitplane_buffer_ + designator->gpio_word;
+  for (int plane = kBitPlanes - pwm_bits_; plane < kBitPlanes; ++plane) {
+    const gpio_bits_t word = bits[plane * columns_];
+    if (word & designator->r_bit) *red   |= 1 << plane;
+    if (word & designator->g_bit) *green |= 1 << plane;
+    if (word & designator->b_bit) *blue  |= 1 << plane;
+  }
+
+  if (inverse_color_) {
+    const uint16_t used = UsedBitsMask();
+    *red = ~(*red) & used;
+    *green = ~(*green) & used;
+    *blue = ~(*blue) & used;
+  }
+}
+
+void Framebuffer::GetPixel(int x, int y,
+                           uint8_t *red, uint8_t *green, uint8_t *blue) const {
+  uint16_t r, g, b;
+  ReadPixel((*shared_mapper_)->get(x, y), &r, &g, &b);
+  *red = UnmapColor(r);
+  *green = UnmapColor(g);
+  *blue = UnmapColor(b);
+}
+
+void Framebuffer::GetPixels(uint8_t *rgb) const {
+  // Unmap through a table of every value, cheaper than searching per pixel.
+  uint8_t unmap[1 << kBitPlanes];
+  const uint16_t used = UsedBitsMask();
+  int c = 0;
+  for (int value = 0; value < (1 << kBitPlanes); ++value) {
+    while (c < 255 && (MapColor(c) & used) < value) ++c;
+    unmap[value] = c;
+  }
+
+  PixelDesignatorMap *const mapper = *shared_mapper_;
+  uint16_t r, g, b;
+  for (int y = 0; y < mapper->height(); ++y) {
+    for (int x = 0; x < mapper->width(); ++x) {
+      ReadPixel(mapper->get(x, y), &r, &g, &b);
+      *rgb++ = unmap[r];
+      *rgb++ = unmap[g];
+      *rgb++ = unmap[b];
+    }
+  }
+}
+
 // Strange LED-mappings such as RBG or so are handled here.
 gpio_bits_t Framebuffer::GetGpioFromLedSequence(char col,
                                                 const char *led_sequence,
@@ -784,6 +784,13 @@ void FrameCanvas::SetPixels(int x, int y, int width, int height,
                          Color *colors) {
   frame_->SetPixels(x, y, width, height, colors);
 }
+void FrameCanvas::GetPixel(int x, int y,
+                           uint8_t *red, uint8_t *green, uint8_t *blue) const {
+  frame_->GetPixel(x, y, red, green, blue);
+}
+void FrameCanvas::GetPixels(uint8_t *rgb) const {
+  frame_->GetPixels(rgb);
+}
 void FrameCanvas::Clear() { return frame_->Clear(); }
 void FrameCanvas::Fill(uint8_t red, uint8_t green, uint8_t blue) {
   frame_->Fill(red, green, blue);